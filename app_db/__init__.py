@@ -8,8 +8,10 @@ from app_db.docs import (
     list_documents,
 )
 from app_db.engine import get_sql_engine
+from app_db.ensure_registry import ensure, ensure_status, register_ensure
 from app_db.example_crud import ensure_example_crud_table
 from app_db.models import DocumentationPage, User
+from app_db.passwords import PasswordHasherBusy
 from app_db.user_roles import (
     ALLOWED_ROLES,
     EDITOR_MENU_ROLES,
@@ -22,8 +24,12 @@ __all__ = [
     "db",
     "User",
     "DocumentationPage",
+    "PasswordHasherBusy",
     "build_database_uri",
     "get_sql_engine",
+    "ensure",
+    "ensure_status",
+    "register_ensure",
     "ensure_example_crud_table",
     "get_all_tags",
     "get_document_by_id",
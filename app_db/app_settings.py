@@ -1,53 +1,164 @@
-"""Simple key-value app settings (e.g. allow_signup). Admin-only writes."""
+"""Typed key-value app settings (e.g. allow_signup). Admin-only writes.
+
+All registered settings are read in one query into an immutable in-process
+snapshot. Writes go through set_setting(), which updates the row and
+invalidates the snapshot in every process via app_db.notify. When this
+process has no live LISTEN connection (Streamlit, scripts, listener down)
+the snapshot is re-read at most every SNAPSHOT_MAX_AGE_SECONDS.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
 
 from sqlalchemy import text
 
+from app_db import notify
 from app_db.engine import get_sql_engine
+from app_db.unit_of_work import write_transaction
 
 KEY_ALLOW_SIGNUP = "allow_signup"
+KEY_SQL_INSTRUMENTATION = "sql_instrumentation"
+NOTIFY_TOPIC = "settings"
+SNAPSHOT_MAX_AGE_SECONDS = 30.0
 
+TRUE_VALUES = ("1", "true", "yes", "on")
 
-def ensure_app_settings_table():
-    """Create app_settings table and default row if missing."""
-    with get_sql_engine().begin() as conn:
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS app_settings (
-                    key VARCHAR(64) PRIMARY KEY,
-                    value VARCHAR(256) NOT NULL
-                )
-                """
+
+@dataclass(frozen=True)
+class SettingSpec:
+    key: str
+    parse: Callable[[str], Any]
+    serialize: Callable[[Any], str]
+    default: Any
+
+
+def _parse_bool(raw: str) -> bool:
+    return (raw or "").strip().lower() in TRUE_VALUES
+
+
+def _serialize_bool(value: Any) -> str:
+    return "true" if value else "false"
+
+
+SETTINGS: Dict[str, SettingSpec] = {}
+
+_lock = threading.Lock()
+_snapshot: Optional[Mapping[str, Any]] = None
+_snapshot_loaded_at = 0.0
+_generation = 0
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def register_setting(key: str, kind: type, default: Any) -> SettingSpec:
+    """Declare a setting; kind is bool, int or str. Call at import time."""
+    if kind is bool:
+        spec = SettingSpec(key, _parse_bool, _serialize_bool, bool(default))
+    elif kind is int:
+        spec = SettingSpec(key, int, str, int(default))
+    else:
+        spec = SettingSpec(key, str, str, str(default))
+    SETTINGS[key] = spec
+    return spec
+
+
+register_setting(KEY_ALLOW_SIGNUP, bool, True)
+register_setting(KEY_SQL_INSTRUMENTATION, bool, False)
+
+
+def ensure_app_settings_table(conn=None):
+    """Create app_settings table and default rows if missing.
+
+    Runs as schema migration 0003; pass conn to join its transaction.
+    """
+    if conn is None:
+        with get_sql_engine().begin() as own_conn:
+            ensure_app_settings_table(own_conn)
+        return
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS app_settings (
+                key VARCHAR(64) PRIMARY KEY,
+                value VARCHAR(256) NOT NULL
             )
+            """
         )
+    )
+    for spec in SETTINGS.values():
         conn.execute(
             text(
                 """
                 INSERT INTO app_settings (key, value)
-                VALUES (:key, 'true')
+                VALUES (:key, :value)
                 ON CONFLICT (key) DO NOTHING
                 """
             ),
-            {"key": KEY_ALLOW_SIGNUP},
+            {"key": spec.key, "value": spec.serialize(spec.default)},
         )
 
 
-def get_allow_signup() -> bool:
-    """Return True if new sign ups are allowed, else False. Default True."""
+def _load_snapshot() -> Mapping[str, Any]:
+    # Fresh connection, not the request's snapshot, which may predate the write
+    # that invalidated us.
     with get_sql_engine().connect() as conn:
-        row = conn.execute(
-            text("SELECT value FROM app_settings WHERE key = :key"),
-            {"key": KEY_ALLOW_SIGNUP},
-        ).fetchone()
-    if not row:
-        return True
-    return (row[0] or "").strip().lower() in ("1", "true", "yes")
+        rows = conn.execute(text("SELECT key, value FROM app_settings")).fetchall()
+    stored = {row[0]: row[1] for row in rows}
+    values = {}
+    for key, spec in SETTINGS.items():
+        raw = stored.get(key)
+        try:
+            values[key] = spec.default if raw is None else spec.parse(raw)
+        except (TypeError, ValueError):
+            values[key] = spec.default
+    return MappingProxyType(values)
 
 
-def set_allow_signup(allowed: bool) -> None:
-    """Set whether new sign ups are allowed. Admin-only."""
-    value = "true" if allowed else "false"
-    with get_sql_engine().begin() as conn:
+def get_settings_snapshot() -> Mapping[str, Any]:
+    """Return the current read-only settings mapping (no query while it is fresh)."""
+    global _snapshot, _snapshot_loaded_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and (notify.is_listening() or now - _snapshot_loaded_at < SNAPSHOT_MAX_AGE_SECONDS):
+        with _lock:
+            _stats["hits"] += 1
+        return snapshot
+
+    with _lock:
+        _stats["misses"] += 1
+        generation = _generation
+    fresh = _load_snapshot()
+    with _lock:
+        # Do not install a snapshot that an invalidation raced past.
+        if generation == _generation:
+            _snapshot = fresh
+            _snapshot_loaded_at = now
+    return fresh
+
+
+def get_setting(key: str) -> Any:
+    return get_settings_snapshot()[key]
+
+
+def _invalidate_local(_payload: str = "") -> None:
+    global _snapshot, _generation
+    with _lock:
+        _snapshot = None
+        _generation += 1
+        _stats["invalidations"] += 1
+
+
+def settings_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return dict(_stats)
+
+
+def set_setting(key: str, value: Any) -> None:
+    """Persist a registered setting and invalidate every process's snapshot."""
+    spec = SETTINGS[key]
+    with write_transaction() as conn:
         conn.execute(
             text(
                 """
@@ -56,5 +167,19 @@ def set_allow_signup(allowed: bool) -> None:
                 ON CONFLICT (key) DO UPDATE SET value = :value
                 """
             ),
-            {"key": KEY_ALLOW_SIGNUP, "value": value},
+            {"key": key, "value": spec.serialize(value)},
         )
+    notify.publish(NOTIFY_TOPIC, key)
+
+
+def get_allow_signup() -> bool:
+    """Return True if new sign ups are allowed, else False. Default True."""
+    return get_setting(KEY_ALLOW_SIGNUP)
+
+
+def set_allow_signup(allowed: bool) -> None:
+    """Set whether new sign ups are allowed. Admin-only."""
+    set_setting(KEY_ALLOW_SIGNUP, bool(allowed))
+
+
+notify.subscribe(NOTIFY_TOPIC, _invalidate_local)
@@ -1,3 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from app_db.engine import get_sql_engine
+
+
+class SharedEngineSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy bound to get_sql_engine() instead of a second pool of its own."""
+
+    def _make_engine(self, bind_key, options, app):
+        if bind_key is None:
+            return get_sql_engine()
+        return super()._make_engine(bind_key, options, app)
+
+
+db = SharedEngineSQLAlchemy()
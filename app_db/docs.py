@@ -1,14 +1,35 @@
+import base64
+import html
+import math
 import re
-from typing import Optional
+from datetime import datetime
+from typing import Optional, Tuple
 
 import bleach
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
-from app_db.engine import get_sql_engine
+from app_db.base import db
+
+from app_db.docs_search import HEADLINE_OPTIONS, SEARCH_CONFIG, build_tsquery
+from app_db.docs_tags import TAG_MATCH_ALL, TAG_MATCH_ANY, tags_filter_sql
 from app_db.models import DocumentationPage
+from app_db.tag_catalog import get_tag_catalog
+from app_db.trigram import trigram_available
+from app_db.unit_of_work import read_connection
 
 
 SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+# Listings count at most this many matches; beyond it the total is shown as "N+".
+EXACT_COUNT_LIMIT = 1000
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+PREVIEW_WORDS = 40
+WORDS_PER_MINUTE = 200
+PLACEHOLDER_SUMMARIES = {"none", "null", "n/a", "-"}
+SLUG_UNIQUE_INDEX = "ix_documentation_pages_slug"
+SLUG_ATTEMPTS = 5
+# Shorter slug substrings match nearly every doc, and trigram indexes cannot serve them.
+SLUG_SEARCH_MIN_LENGTH = 3
 
 # Allowed HTML for doc body (Quill-style rich text); script/style and event handlers stripped.
 ALLOWED_TAGS = [
@@ -46,18 +67,124 @@ def normalize_tags(tags_csv: str) -> str:
     return ",".join(deduped)
 
 
-def _ensure_unique_slug(base_slug: str, doc_id: Optional[int] = None) -> str:
-    candidate = base_slug
-    suffix = 2
+def build_doc_preview(summary: Optional[str], content_html: Optional[str]) -> Tuple[str, int, int]:
+    """(preview_text, word_count, reading_minutes) stored with a doc so listings never read its body.
+
+    The preview is the summary, or the start of the body when the summary is
+    empty or a placeholder, cut to PREVIEW_WORDS words.
+    """
+    body_words = html.unescape(HTML_TAG_RE.sub(" ", content_html or "")).split()
+    source_words = (summary or "").split()
+    if not source_words or (summary or "").strip().lower() in PLACEHOLDER_SUMMARIES:
+        source_words = body_words
+    preview = " ".join(source_words[:PREVIEW_WORDS])
+    if len(source_words) > PREVIEW_WORDS:
+        preview += "..."
+    word_count = len(body_words)
+    reading_minutes = math.ceil(word_count / WORDS_PER_MINUTE) if word_count else 0
+    return preview, word_count, reading_minutes
+
+
+def backfill_doc_previews(conn, batch_size: int = 500) -> int:
+    """Fill preview_text/word_count/reading_minutes where preview_text is NULL; returns rows updated.
+
+    Used by schema migration 0008 and after bulk inserts that bypass
+    create_or_update_document (benchmarks/seed.py).
+    """
+    updated = 0
     while True:
-        query = DocumentationPage.query.filter_by(slug=candidate)
-        if doc_id is not None:
-            query = query.filter(DocumentationPage.id != doc_id)
-        exists = query.first()
-        if not exists:
-            return candidate
-        candidate = f"{base_slug}-{suffix}"
-        suffix += 1
+        rows = conn.execute(
+            text(
+                """
+                SELECT id, summary, content_html FROM documentation_pages
+                WHERE preview_text IS NULL
+                ORDER BY id
+                LIMIT :batch_size
+                """
+            ),
+            {"batch_size": batch_size},
+        ).fetchall()
+        if not rows:
+            return updated
+        values = []
+        for doc_id, summary, content_html in rows:
+            preview, word_count, reading_minutes = build_doc_preview(summary, content_html)
+            values.append(
+                {"id": doc_id, "preview": preview, "word_count": word_count, "reading_minutes": reading_minutes}
+            )
+        conn.execute(
+            text(
+                """
+                UPDATE documentation_pages
+                SET preview_text = :preview, word_count = :word_count, reading_minutes = :reading_minutes
+                WHERE id = :id
+                """
+            ),
+            values,
+        )
+        updated += len(values)
+
+
+def _allocate_slug(base_slug: str, doc_id: Optional[int] = None, after: Optional[int] = None) -> str:
+    """base_slug if free, else base_slug-N with N the lowest free counter, in one query.
+
+    Candidates are 2 and one past every numeric suffix in use; the smallest
+    candidate not taken is the first gap, so "Release 2024" existing does
+    not push the next "Release" to release-2025, and no suffix width is
+    special. `after` (the counter of a slug that just lost a race) skips the
+    bare slug and every counter up to it.
+
+    `slug LIKE 'base-%'` is a range scan on ix_documentation_pages_slug_pattern
+    (text_pattern_ops). Slugs only contain [a-z0-9-], so no LIKE escaping is
+    needed.
+    """
+    return db.session.execute(
+        text(
+            r"""
+            WITH taken AS (
+                SELECT substring(slug FROM :suffix_start)::bigint AS n
+                FROM documentation_pages
+                WHERE slug LIKE :pattern
+                  AND substring(slug FROM :suffix_start) ~ '^[1-9][0-9]{0,17}$'
+                  AND id IS DISTINCT FROM :doc_id
+            )
+            SELECT CASE
+                WHEN :try_base AND NOT EXISTS (
+                    SELECT 1 FROM documentation_pages
+                    WHERE slug = :base AND id IS DISTINCT FROM :doc_id
+                ) THEN :base
+                ELSE :base || '-' || (
+                    SELECT min(candidate.n)
+                    FROM (
+                        SELECT CAST(:first_counter AS bigint) AS n
+                        UNION ALL
+                        SELECT n + 1 FROM taken WHERE n + 1 > :first_counter
+                    ) AS candidate
+                    WHERE NOT EXISTS (SELECT 1 FROM taken WHERE taken.n = candidate.n)
+                )
+            END
+            """
+        ),
+        {
+            "base": base_slug,
+            "doc_id": doc_id,
+            "pattern": f"{base_slug}-%",
+            "suffix_start": len(base_slug) + 2,
+            "try_base": after is None,
+            "first_counter": max(2, (after or 0) + 1),
+        },
+    ).scalar_one()
+
+
+def _slug_counter(slug: str, base_slug: str) -> int:
+    """Counter of a slug from _allocate_slug(); 1 for the bare base slug."""
+    suffix = slug[len(base_slug) + 1:]
+    return int(suffix) if suffix.isdigit() else 1
+
+
+def _is_slug_conflict(exc: IntegrityError) -> bool:
+    diag = getattr(exc.orig, "diag", None)
+    return getattr(diag, "constraint_name", None) == SLUG_UNIQUE_INDEX
 
 
 def get_document_by_id(doc_id: int) -> Optional[DocumentationPage]:
@@ -78,48 +205,99 @@ def create_or_update_document(
     created_by: int,
     slug: Optional[str] = None,
 ) -> DocumentationPage:
+    """Create or update a doc and flush it to the session; the caller commits.
+
+    The slug is allocated with one query and flushed in a savepoint. If a
+    concurrent save took the same slug first, the unique violation rolls
+    back only the savepoint and the next free counter above the one that
+    collided is tried.
+    """
     title_clean = (title or "").strip()
     summary_clean = (summary or "").strip()
     tags_clean = normalize_tags(tags_csv)
     slug_base = slugify(slug or title_clean)
     content_safe = sanitize_doc_html(content_html or "")
+    preview = build_doc_preview(summary_clean, content_safe)
 
-    if doc_id > 0:
-        page = DocumentationPage.query.get_or_404(doc_id)
+    page = DocumentationPage.query.get_or_404(doc_id) if doc_id > 0 else DocumentationPage()
+    taken_counter = None
+    for attempt in range(1, SLUG_ATTEMPTS + 1):
+        # Re-applied on every attempt: a rolled-back savepoint expires the changes made in it.
         page.title = title_clean
         page.summary = summary_clean or None
         page.content_html = content_safe
+        page.preview_text, page.word_count, page.reading_minutes = preview
         page.tags_csv = tags_clean or None
-        page.slug = _ensure_unique_slug(slug_base, doc_id=page.id)
-        return page
-
-    page = DocumentationPage()
-    page.title = title_clean
-    page.summary = summary_clean or None
-    page.content_html = content_safe
-    page.tags_csv = tags_clean or None
-    page.created_by = created_by
-    page.slug = _ensure_unique_slug(slug_base)
+        page.tags = tags_clean.split(",") if tags_clean else []
+        if doc_id <= 0:
+            page.created_by = created_by
+        proposed_slug = _allocate_slug(slug_base, doc_id=page.id, after=taken_counter)
+        page.slug = proposed_slug
+        try:
+            with db.session.begin_nested():
+                db.session.add(page)
+                db.session.flush()
+            return page
+        except IntegrityError as exc:
+            if attempt == SLUG_ATTEMPTS or not _is_slug_conflict(exc):
+                raise
+            # Someone else holds this slug; continue past it rather than re-proposing it.
+            taken_counter = _slug_counter(proposed_slug, slug_base)
     return page
 
 
 def get_all_tags():
-    """Return sorted list of distinct tags used across all documents."""
-    query = text(
-        """
-        SELECT DISTINCT LOWER(TRIM(tag)) AS tag
-        FROM documentation_pages,
-             LATERAL unnest(string_to_array(coalesce(tags_csv, ''), ',')) AS tag
-        WHERE TRIM(tag) != ''
-        ORDER BY tag
-        """
-    )
-    with get_sql_engine().connect() as conn:
-        rows = conn.execute(query).fetchall()
-    return [r[0] for r in rows]
+    """Return sorted list of distinct tags used across all documents (cached, see app_db/tag_catalog.py)."""
+    return [item["tag"] for item in get_tag_catalog()]
+
+
+def encode_cursor(updated_at: datetime, doc_id: int) -> str:
+    """Opaque keyset cursor for the (updated_at, id) listing order."""
+    raw = f"{updated_at.isoformat()}|{int(doc_id)}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
 
-def list_documents(search: str = "", tag: str = "", tags: list = None, *, page: int = 1, per_page: int = 12):
+def decode_cursor(token: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """(updated_at, id) from encode_cursor(); None for missing or tampered tokens."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("utf-8")
+        updated_at, doc_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(updated_at), int(doc_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def list_documents(
+    search: str = "",
+    tag: str = "",
+    tags: list = None,
+    *,
+    page: int = 1,
+    per_page: int = 12,
+    after: str = "",
+    before: str = "",
+    facets: bool = False,
+    tag_match: str = TAG_MATCH_ANY,
+):
+    """One page of docs plus the context needed to link its neighbours, in one statement.
+
+    The plain listing (newest first) is keyset-paginated on (updated_at, id):
+    pass the page's next_cursor as `after` or its prev_cursor as `before`, and
+    every page costs an index range scan of per_page rows however deep it is.
+    `page` only numbers pages for display there; without a cursor it falls
+    back to OFFSET (old links). Searches are ranked, so they keep OFFSET.
+
+    Tags filter on the indexed tags array: docs with any of them, or all of
+    them with tag_match="all".
+
+    The total is counted up to EXACT_COUNT_LIMIT. With facets=True the same
+    statement returns [{"tag", "count"}] for the docs matching the search.
+    In "any" mode the tag filter is left out, since picking another tag
+    widens the result; in "all" mode it narrows it, so the filter applies.
+    Unfiltered facets are the cached tag catalog, not part of the query.
+    """
     search_term = (search or "").strip().lower()
     tag_term = (tag or "").strip().lower()
     tags_list = tags or []
@@ -129,70 +307,176 @@ def list_documents(search: str = "", tag: str = "", tags: list = None, *, page:
     safe_page = max(1, int(page or 1))
     safe_per_page = max(1, min(100, int(per_page or 12)))
 
-    where_clauses = []
+    search_clauses = []
     params = {}
-    order_by_sql = "updated_at DESC, id DESC"
-
-    if search_term:
-        where_clauses.append(
-            "("
-            "lower(title) LIKE :search "
-            "OR lower(slug) LIKE :search "
-            "OR lower(coalesce(content_html, '')) LIKE :search"
-            ")"
-        )
-        params["search"] = f"%{search_term}%"
-        order_by_sql = (
-            "CASE "
-            "WHEN lower(title) LIKE :search OR lower(slug) LIKE :search THEN 0 "
-            "WHEN lower(coalesce(content_html, '')) LIKE :search THEN 1 "
-            "ELSE 2 "
-            "END, updated_at DESC, id DESC"
-        )
 
+    tsquery = build_tsquery(search_term)
+    if tsquery:
+        # GIN-indexed full-text match; see app_db/docs_search.py.
+        match_sql = f"search_vector @@ to_tsquery('{SEARCH_CONFIG}', :tsquery)"
+        rank_sql = f"ts_rank(search_vector, to_tsquery('{SEARCH_CONFIG}', :tsquery))"
+        params["tsquery"] = tsquery
+        if trigram_available():
+            # Partial words and typos in the title, substrings of the slug; both
+            # served by the pg_trgm GIN indexes (app_db/trigram.py).
+            fuzzy_sql = ":search_term <% lower(title)"
+            slug_term = SLUG_PATTERN.sub("-", search_term).strip("-")
+            if len(slug_term) >= SLUG_SEARCH_MIN_LENGTH:
+                fuzzy_sql = f"{fuzzy_sql} OR slug LIKE :slug_pattern"
+                params["slug_pattern"] = f"%{slug_term}%"
+            match_sql = f"({match_sql} OR {fuzzy_sql})"
+            rank_sql = f"{rank_sql} + word_similarity(:search_term, lower(title))"
+            params["search_term"] = search_term
+        search_clauses.append(match_sql)
+
+    tag_clauses = []
     if tags_list:
-        tag_conditions = []
-        for i, t in enumerate(tags_list):
-            key = f"tag_token_{i}"
-            params[key] = f",{t},"
-            tag_conditions.append(f"position(:{key} in concat(',', coalesce(lower(tags_csv), ''), ',')) > 0")
-        where_clauses.append("(" + " OR ".join(tag_conditions) + ")")
+        # GIN-indexed array match; see app_db/docs_tags.py.
+        tag_clauses.append(tags_filter_sql(tag_match))
+        params["filter_tags"] = tags_list
 
+    where_clauses = search_clauses + tag_clauses
     where_sql = ""
     if where_clauses:
         where_sql = "WHERE " + " AND ".join(where_clauses)
 
-    count_query = text(
+    keyset = not tsquery
+    cursor = decode_cursor(before) if keyset else None
+    backwards = cursor is not None
+    if keyset and cursor is None:
+        cursor = decode_cursor(after)
+
+    page_where = list(where_clauses)
+    if cursor is not None:
+        # Row comparison matches ix_documentation_pages_updated_at_id directly.
+        page_where.append(f"(updated_at, id) {'>' if backwards else '<'} (:cursor_updated_at, :cursor_id)")
+        params["cursor_updated_at"], params["cursor_id"] = cursor
+    page_where_sql = ("WHERE " + " AND ".join(page_where)) if page_where else ""
+
+    direction = "ASC" if backwards else "DESC"
+    sort_keys = (["search_rank"] if tsquery else []) + ["updated_at", "id"]
+    order_sql = ", ".join(f"{key} {direction}" for key in sort_keys)
+    outer_order_sql = ", ".join(f"page_rows.{key} {direction}" for key in sort_keys)
+    rank_column_sql = f", {rank_sql} AS search_rank" if tsquery else ""
+    # Snippets only for the rows on this page, not for every match. The body is
+    # read inside the database for them; listings never ship content_html.
+    headline_sql = (
         f"""
-        SELECT count(*) AS total
-        FROM documentation_pages
-        {where_sql}
+        , ts_headline(
+            '{SEARCH_CONFIG}',
+            regexp_replace(
+                coalesce((SELECT bodies.content_html FROM documentation_pages AS bodies WHERE bodies.id = page_rows.id), ''),
+                '<[^>]*>', ' ', 'g'
+            ),
+            to_tsquery('{SEARCH_CONFIG}', :tsquery),
+            :headline_options
+        ) AS search_headline
         """
+        if tsquery
+        else ""
     )
-
-    data_query = text(
+    if tsquery:
+        params["headline_options"] = HEADLINE_OPTIONS
+    facet_clauses = where_clauses if tag_match == TAG_MATCH_ALL else search_clauses
+    facet_where_sql = ("WHERE " + " AND ".join(facet_clauses)) if facet_clauses else ""
+    catalog_facets = facets and not facet_clauses
+    facets_sql = (
         f"""
-        SELECT id, title, slug, summary, content_html, tags_csv, created_at, updated_at
-        FROM documentation_pages
-        {where_sql}
-        ORDER BY {order_by_sql}
-        LIMIT :limit_value
-        OFFSET :offset_value
+        (
+            SELECT coalesce(json_agg(json_build_object('tag', tag, 'count', uses) ORDER BY tag), '[]'::json)
+            FROM (
+                SELECT tag, count(*) AS uses
+                FROM documentation_pages, LATERAL unnest(tags) AS tag
+                {facet_where_sql}
+                GROUP BY tag
+            ) AS tag_counts
+        )
         """
+        if facets and not catalog_facets
+        else "NULL::json"
     )
 
-    with get_sql_engine().connect() as conn:
-        total = conn.execute(count_query, params).scalar_one()
-        total_pages = max(1, (int(total or 0) + safe_per_page - 1) // safe_per_page)
-        safe_page = min(safe_page, total_pages)
-        offset = (safe_page - 1) * safe_per_page
-        result = conn.execute(
-            data_query,
-            {**params, "limit_value": safe_per_page, "offset_value": offset},
+    # One row per doc on the page (one extra tells whether another page follows),
+    # each carrying the capped total and the facets; a lone all-NULL row when the
+    # page is empty. The extra row costs nothing next to a second round trip.
+    query = text(
+        f"""
+        WITH page_rows AS (
+            SELECT id, title, slug, summary, preview_text, word_count, reading_minutes,
+                   tags_csv, tags, created_at, updated_at
+                   {rank_column_sql}
+            FROM documentation_pages
+            {page_where_sql}
+            ORDER BY {order_sql}
+            LIMIT :limit_value
+            OFFSET :offset_value
+        ),
+        totals AS (
+            SELECT
+                (
+                    SELECT count(*) FROM (
+                        SELECT 1 FROM documentation_pages {where_sql} LIMIT :count_limit
+                    ) AS capped
+                ) AS listing_total,
+                {facets_sql} AS listing_facets
         )
-        return {
-            "items": result.mappings().all(),
-            "total": int(total or 0),
-            "page": safe_page,
-            "per_page": safe_per_page,
-        }
+        SELECT totals.listing_total, totals.listing_facets, page_rows.* {headline_sql}
+        FROM totals
+        LEFT JOIN page_rows ON true
+        ORDER BY {outer_order_sql}
+        """
+    )
+
+    offset = 0 if cursor is not None else (safe_page - 1) * safe_per_page
+    with read_connection() as conn:
+        rows = conn.execute(
+            query,
+            {
+                **params,
+                "limit_value": safe_per_page + 1,
+                "offset_value": offset,
+                "count_limit": EXACT_COUNT_LIMIT + 1,
+            },
+        ).mappings().all()
+
+    total = int(rows[0]["listing_total"])
+    total_exact = total <= EXACT_COUNT_LIMIT
+    if not total_exact:
+        total = EXACT_COUNT_LIMIT
+    items = [
+        {key: value for key, value in row.items() if key not in ("listing_total", "listing_facets")}
+        for row in rows
+        if row["id"] is not None
+    ]
+    if cursor is None and total_exact and offset and not items:
+        # Page number past the end (old link, or docs deleted since): show the last page.
+        last_page = max(1, (total + safe_per_page - 1) // safe_per_page)
+        if last_page < safe_page:
+            return list_documents(
+                search, tags=tags_list, page=last_page, per_page=safe_per_page, facets=facets, tag_match=tag_match
+            )
+
+    has_more = len(items) > safe_per_page
+    items = items[:safe_per_page]
+    if backwards:
+        if not has_more:
+            # Walked back to the start: serve a full first page instead of a short one.
+            return list_documents(
+                search, tags=tags_list, page=1, per_page=safe_per_page, facets=facets, tag_match=tag_match
+            )
+        items.reverse()
+    has_prev = has_more if backwards else (cursor is not None or offset > 0)
+    has_next = True if backwards else has_more
+    return {
+        "items": items,
+        "total": total,
+        "total_exact": total_exact,
+        "facets": (get_tag_catalog() if catalog_facets else rows[0]["listing_facets"]) if facets else None,
+        "page": safe_page,
+        "per_page": safe_per_page,
+        "keyset": keyset,
+        "has_prev": has_prev,
+        "has_next": has_next,
+        "prev_cursor": encode_cursor(items[0]["updated_at"], items[0]["id"]) if keyset and has_prev and items else None,
+        "next_cursor": encode_cursor(items[-1]["updated_at"], items[-1]["id"]) if keyset and has_next and items else None,
+    }
@@ -0,0 +1,138 @@
+"""Full-text search over documentation_pages.
+
+documentation_pages.search_vector is a weighted tsvector kept current by a
+trigger: title (A), summary and tags (B), and the body with HTML tags
+stripped (C). A GIN index serves `search_vector @@ query`, so search cost
+follows the number of matches rather than the size of the corpus.
+
+The SQL function docs_search_document() holds the expression. Change it
+(and SEARCH_CONFIG) in a new migration, then run
+scripts/reindex_docs_search.py to rebuild existing rows.
+"""
+
+import html
+import re
+from typing import Optional
+
+from markupsafe import Markup, escape
+from sqlalchemy import text
+
+from app_db.engine import get_sql_engine
+
+SEARCH_CONFIG = "english"
+TERM_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERMS = 8
+
+# ts_headline markers that cannot occur in stripped body text; swapped for <mark> after escaping.
+HEADLINE_START = "\x02"
+HEADLINE_STOP = "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={HEADLINE_START}, StopSel={HEADLINE_STOP}, MaxWords=35, MinWords=15, MaxFragments=2, "
+    "FragmentDelimiter=\" … \""
+)
+
+
+def install_docs_search(conn) -> None:
+    """DDL for search_vector, its trigger and GIN index, plus a backfill. Schema migration 0004."""
+    conn.execute(text("ALTER TABLE documentation_pages ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+    conn.execute(
+        text(
+            f"""
+            CREATE OR REPLACE FUNCTION docs_search_document(
+                title TEXT, summary TEXT, content_html TEXT, tags_csv TEXT
+            ) RETURNS tsvector
+            LANGUAGE sql IMMUTABLE AS $$
+                SELECT
+                    setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')
+                    || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'B')
+                    || setweight(to_tsvector('{SEARCH_CONFIG}', replace(coalesce(tags_csv, ''), ',', ' ')), 'B')
+                    || setweight(
+                        to_tsvector('{SEARCH_CONFIG}', regexp_replace(coalesce(content_html, ''), '<[^>]*>', ' ', 'g')),
+                        'C'
+                    )
+            $$
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION docs_search_vector_refresh() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.search_vector := docs_search_document(NEW.title, NEW.summary, NEW.content_html, NEW.tags_csv);
+                RETURN NEW;
+            END
+            $$
+            """
+        )
+    )
+    conn.execute(text("DROP TRIGGER IF EXISTS documentation_pages_search_vector ON documentation_pages"))
+    conn.execute(
+        text(
+            """
+            CREATE TRIGGER documentation_pages_search_vector
+            BEFORE INSERT OR UPDATE OF title, summary, content_html, tags_csv ON documentation_pages
+            FOR EACH ROW EXECUTE FUNCTION docs_search_vector_refresh()
+            """
+        )
+    )
+    conn.execute(
+        text(
+            "UPDATE documentation_pages "
+            "SET search_vector = docs_search_document(title, summary, content_html, tags_csv)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_documentation_pages_search_vector "
+            "ON documentation_pages USING GIN (search_vector)"
+        )
+    )
+
+
+def build_tsquery(search: str) -> Optional[str]:
+    """Turn free text into a to_tsquery() string: all words must match, the last as a prefix.
+
+    Only \\w+ runs survive, so the result never contains tsquery operators
+    from user input. None when there is nothing searchable.
+    """
+    terms = TERM_RE.findall((search or "").lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    parts = [f"'{term}'" for term in terms[:-1]]
+    parts.append(f"'{terms[-1]}':*")
+    return " & ".join(parts)
+
+
+def render_headline(raw: Optional[str]) -> Markup:
+    """Escape a ts_headline snippet and turn its markers into <mark> tags."""
+    if not raw:
+        return Markup("")
+    escaped = str(escape(html.unescape(raw)))
+    return Markup(escaped.replace(HEADLINE_START, "<mark>").replace(HEADLINE_STOP, "</mark>"))
+
+
+def reindex_docs_search(batch_size: int = 500) -> int:
+    """Recompute search_vector for every row in id-ordered batches; returns rows updated."""
+    updated = 0
+    last_id = 0
+    while True:
+        with get_sql_engine().begin() as conn:
+            ids = conn.execute(
+                text(
+                    """
+                    UPDATE documentation_pages AS d
+                    SET search_vector = docs_search_document(d.title, d.summary, d.content_html, d.tags_csv)
+                    WHERE d.id IN (
+                        SELECT id FROM documentation_pages WHERE id > :last_id ORDER BY id LIMIT :batch_size
+                    )
+                    RETURNING d.id
+                    """
+                ),
+                {"last_id": last_id, "batch_size": batch_size},
+            ).scalars().all()
+        if not ids:
+            return updated
+        updated += len(ids)
+        last_id = max(ids)
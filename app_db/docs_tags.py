@@ -0,0 +1,50 @@
+"""Indexed tag storage for documentation_pages.
+
+documentation_pages.tags is a text[] holding the normalized tags (lowercase,
+deduplicated, in entry order), with a GIN index. `tags && :tags` (any of)
+and `tags @> :tags` (all of) are index lookups, unlike substring matches on
+tags_csv. tags_csv stays as the editable form and feeds the search vector;
+create_or_update_document() writes both.
+"""
+
+from sqlalchemy import text
+
+TAG_MATCH_ANY = "any"
+TAG_MATCH_ALL = "all"
+TAG_MATCH_OPERATORS = {TAG_MATCH_ANY: "&&", TAG_MATCH_ALL: "@>"}
+
+
+def install_docs_tags(conn) -> None:
+    """tags column and GIN index, backfilled from tags_csv. Schema migration 0007."""
+    conn.execute(
+        text("ALTER TABLE documentation_pages ADD COLUMN IF NOT EXISTS tags TEXT[] NOT NULL DEFAULT '{}'")
+    )
+    conn.execute(
+        text(
+            """
+            UPDATE documentation_pages AS d
+            SET tags = coalesce(
+                (
+                    SELECT array_agg(tag ORDER BY first_position)
+                    FROM (
+                        SELECT lower(trim(raw_tag)) AS tag, min(position) AS first_position
+                        FROM unnest(string_to_array(coalesce(d.tags_csv, ''), ','))
+                             WITH ORDINALITY AS items(raw_tag, position)
+                        WHERE trim(raw_tag) != ''
+                        GROUP BY 1
+                    ) AS normalized
+                ),
+                '{}'
+            )
+            """
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_documentation_pages_tags ON documentation_pages USING GIN (tags)")
+    )
+
+
+def tags_filter_sql(match: str, param: str = "filter_tags") -> str:
+    """WHERE fragment for docs carrying any (or all) of the tags bound to :param."""
+    operator = TAG_MATCH_OPERATORS.get(match, TAG_MATCH_OPERATORS[TAG_MATCH_ANY])
+    return f"tags {operator} CAST(:{param} AS TEXT[])"
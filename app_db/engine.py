@@ -1,16 +1,146 @@
-from sqlalchemy import create_engine
+"""The process-wide SQLAlchemy engine.
+
+Flask-SQLAlchemy (app_db.base.db) and raw get_sql_engine() callers share
+this one engine, so each process holds a single connection pool. Pool sizing
+comes from the DB_POOL_* environment variables. Instead of pinging on every
+checkout (pool_pre_ping), a connection is only pinged when it sat idle in the
+pool longer than DB_POOL_PING_IDLE seconds; a failed ping discards it and the
+pool hands out a fresh one.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 
 from app_db.config import build_database_uri
 
-_sql_engine = None
+_lock = threading.Lock()
+_sql_engine: Optional[Engine] = None
+_ping_idle_seconds = 30.0
+
+_stats_lock = threading.Lock()
+_stats = {"checkouts": 0, "timeouts": 0, "pings": 0, "ping_failures": 0}
+_wait_seconds_total = 0.0
+_wait_seconds_max = 0.0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long callers waited for a connection."""
+
+    def _do_get(self):
+        global _wait_seconds_total, _wait_seconds_max
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with _stats_lock:
+                _stats["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with _stats_lock:
+                _stats["checkouts"] += 1
+                _wait_seconds_total += waited
+                _wait_seconds_max = max(_wait_seconds_max, waited)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)))
+
 
+def _install_idle_ping(engine: Engine) -> None:
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(_dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
 
-def get_sql_engine():
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, _connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < _ping_idle_seconds:
+            return
+        with _stats_lock:
+            _stats["pings"] += 1
+        try:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            # The driver opened a transaction for the ping; hand the connection out
+            # without it, so isolation-level and autocommit changes still work for the caller.
+            dbapi_connection.rollback()
+        except Exception as exc:
+            with _stats_lock:
+                _stats["ping_failures"] += 1
+            # Tells the pool to drop this connection and retry with a new one.
+            raise DisconnectionError() from exc
+
+
+def _build_engine() -> Engine:
+    global _ping_idle_seconds
+    _ping_idle_seconds = float(os.environ.get("DB_POOL_PING_IDLE", "30"))
+    engine = create_engine(
+        build_database_uri(),
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=_env_int("DB_POOL_SIZE", 5),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", 1800),
+        pool_timeout=float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        pool_use_lifo=True,
+    )
+    if _ping_idle_seconds >= 0:
+        _install_idle_ping(engine)
+    return engine
+
+
+def get_sql_engine() -> Engine:
     global _sql_engine
-    if _sql_engine is None:
-        _sql_engine = create_engine(
-            build_database_uri(),
-            future=True,
-            pool_pre_ping=True,
+    engine = _sql_engine
+    if engine is None:
+        with _lock:
+            if _sql_engine is None:
+                _sql_engine = _build_engine()
+            engine = _sql_engine
+    return engine
+
+
+def pool_stats() -> Dict[str, object]:
+    """Current pool occupancy plus checkout/wait counters for this process."""
+    engine = _sql_engine
+    pool = engine.pool if engine is not None else None
+    with _stats_lock:
+        stats: Dict[str, object] = {
+            **_stats,
+            "wait_ms_total": round(_wait_seconds_total * 1000, 1),
+            "wait_ms_max": round(_wait_seconds_max * 1000, 1),
+        }
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(0, pool.overflow()),
         )
-    return _sql_engine
+    else:
+        stats.update(size=0, checked_out=0, checked_in=0, overflow=0)
+    return stats
+
+
+def dispose_sql_engine(close: bool = False) -> None:
+    """Drop pooled connections. close=False is for a forked child: the parent's
+    sockets must not be closed (or used) from here, only forgotten."""
+    if _sql_engine is not None:
+        _sql_engine.dispose(close=close)
+
+
+if hasattr(os, "register_at_fork"):
+    # Pre-fork servers (gunicorn --preload) copy the parent's pool; never share it.
+    os.register_at_fork(after_in_child=dispose_sql_engine)
@@ -0,0 +1,81 @@
+"""Run feature-table DDL at most once per process (per version).
+
+Feature modules register their idempotent DDL and call ensure() from their
+routes. The first call in a process runs it in its own transaction; every
+later call is an in-memory set lookup, so request handlers stop paying a
+CREATE TABLE IF NOT EXISTS round trip (and catalog lock) per page view.
+Bump the version when the DDL changes to have each process run it again.
+
+    @register_ensure("my_table")
+    def _create_my_table(conn):
+        conn.execute(text("CREATE TABLE IF NOT EXISTS my_table (...)"))
+
+    ensure("my_table")
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Set, Tuple
+
+from app_db.engine import get_sql_engine
+
+
+@dataclass(frozen=True)
+class EnsureStep:
+    name: str
+    version: str
+    apply: Callable
+
+
+_lock = threading.Lock()
+_steps: Dict[str, EnsureStep] = {}
+_done: Set[Tuple[str, str]] = set()
+_history: List[Dict[str, object]] = []
+
+
+def register_ensure(name: str, version: str = "1"):
+    def outer(fn):
+        _steps[name] = EnsureStep(name, version, fn)
+        return fn
+
+    return outer
+
+
+def ensure(name: str) -> bool:
+    """Run the named DDL if this process has not yet; True if it ran now."""
+    step = _steps[name]
+    key = (step.name, step.version)
+    if key in _done:
+        return False
+    with _lock:
+        if key in _done:
+            return False
+        started = time.perf_counter()
+        with get_sql_engine().begin() as conn:
+            step.apply(conn)
+        _done.add(key)
+        _history.append(
+            {
+                "name": step.name,
+                "version": step.version,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "ran_at": time.time(),
+            }
+        )
+    return True
+
+
+def ensure_status() -> List[Dict[str, object]]:
+    """Registered ensures and whether (and how long) each ran in this process."""
+    with _lock:
+        ran = {(item["name"], item["version"]): item for item in _history}
+        return [
+            {
+                "name": step.name,
+                "version": step.version,
+                "ran": (step.name, step.version) in _done,
+                "duration_ms": ran.get((step.name, step.version), {}).get("duration_ms"),
+            }
+            for step in _steps.values()
+        ]
@@ -1,19 +1,25 @@
 from sqlalchemy import text
 
-from app_db.engine import get_sql_engine
+from app_db.ensure_registry import ensure, register_ensure
 
-def ensure_example_crud_table():
-    with get_sql_engine().begin() as conn:
-        conn.execute(
-            text(
-                """
-                CREATE TABLE IF NOT EXISTS example_crud_items (
-                    id BIGSERIAL PRIMARY KEY,
-                    name VARCHAR(150) NOT NULL,
-                    description TEXT,
-                    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
-                    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-                )
-                """
+
+@register_ensure("example_crud_items")
+def _create_example_crud_items(conn):
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS example_crud_items (
+                id BIGSERIAL PRIMARY KEY,
+                name VARCHAR(150) NOT NULL,
+                description TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
             )
+            """
         )
+    )
+
+
+def ensure_example_crud_table():
+    # Memoized: DDL runs on the first call in each process only.
+    ensure("example_crud_items")
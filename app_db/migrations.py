@@ -0,0 +1,183 @@
+"""Ordered schema steps recorded in a schema_migrations table.
+
+create_app() calls run_migrations(). When every registered step is already
+recorded this costs a single SELECT. Otherwise pending steps run in one
+transaction under a PostgreSQL advisory lock, so when many workers boot at
+once exactly one applies the DDL and the others wait, re-check and skip.
+
+Add a step by decorating a function that takes a Connection:
+
+    @migration("0004_add_my_column", "Add my_table.my_column")
+    def _add_my_column(conn):
+        conn.execute(text("ALTER TABLE my_table ADD COLUMN IF NOT EXISTS my_column TEXT"))
+
+Versions are applied in registration order and must never be renamed.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Set
+
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+
+from app_db.engine import get_sql_engine
+
+MIGRATIONS_TABLE = "schema_migrations"
+# Arbitrary app-wide key for pg_advisory_xact_lock.
+ADVISORY_LOCK_KEY = 7_240_119_001
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    description: str
+    apply: Callable
+
+
+_MIGRATIONS: List[Migration] = []
+
+
+def migration(version: str, description: str):
+    def outer(fn):
+        if any(existing.version == version for existing in _MIGRATIONS):
+            raise ValueError(f"Duplicate migration version: {version}")
+        _MIGRATIONS.append(Migration(version, description, fn))
+        return fn
+
+    return outer
+
+
+def registered_migrations() -> List[Migration]:
+    return list(_MIGRATIONS)
+
+
+def _applied_versions(conn) -> Set[str]:
+    rows = conn.execute(text(f"SELECT version FROM {MIGRATIONS_TABLE}")).fetchall()
+    return {row[0] for row in rows}
+
+
+def applied_versions() -> Set[str]:
+    """Recorded versions; empty if the migrations table does not exist yet."""
+    with get_sql_engine().connect() as conn:
+        try:
+            return _applied_versions(conn)
+        except ProgrammingError:
+            return set()
+
+
+def run_migrations() -> List[str]:
+    """Apply pending steps (if any) and return the versions applied by this call."""
+    applied = applied_versions()
+    if all(step.version in applied for step in _MIGRATIONS):
+        return []
+
+    ran = []
+    with get_sql_engine().begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                    version VARCHAR(128) PRIMARY KEY,
+                    description VARCHAR(256) NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+                )
+                """
+            )
+        )
+        # Another process may have finished while we waited for the lock.
+        applied = _applied_versions(conn)
+        for step in _MIGRATIONS:
+            if step.version in applied:
+                continue
+            logger.info("Applying schema migration %s: %s", step.version, step.description)
+            step.apply(conn)
+            conn.execute(
+                text(f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES (:version, :description)"),
+                {"version": step.version, "description": step.description},
+            )
+            ran.append(step.version)
+    return ran
+
+
+# ---------------------------------------------------------------------------
+# Steps. Keep in order; append new ones at the end.
+# ---------------------------------------------------------------------------
+
+
+@migration("0001_orm_tables", "Create ORM tables (user, documentation_pages)")
+def _orm_tables(conn):
+    from app_db.base import db
+    import app_db.models  # noqa: F401  (registers the models on db.metadata)
+
+    db.metadata.create_all(bind=conn)
+
+
+@migration("0002_user_role_column", "Ensure user.role exists and is populated")
+def _user_role_column(conn):
+    from app_db.user_roles import ensure_user_role_column
+
+    ensure_user_role_column(conn)
+
+
+@migration("0003_app_settings", "Create app_settings with default rows")
+def _app_settings(conn):
+    from app_db.app_settings import ensure_app_settings_table
+
+    ensure_app_settings_table(conn)
+
+
+@migration("0004_docs_search_vector", "Full-text search_vector on documentation_pages (trigger + GIN)")
+def _docs_search_vector(conn):
+    from app_db.docs_search import install_docs_search
+
+    install_docs_search(conn)
+
+
+@migration("0005_docs_trigram", "pg_trgm GIN indexes on documentation_pages title/slug (skipped without the extension)")
+def _docs_trigram(conn):
+    from app_db.trigram import install_docs_trigram_indexes
+
+    install_docs_trigram_indexes(conn)
+
+
+@migration("0006_docs_keyset_index", "Index documentation_pages (updated_at, id) for keyset pagination")
+def _docs_keyset_index(conn):
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_documentation_pages_updated_at_id "
+            "ON documentation_pages (updated_at, id)"
+        )
+    )
+
+
+@migration("0007_docs_tags_array", "documentation_pages.tags text[] with GIN index, backfilled from tags_csv")
+def _docs_tags_array(conn):
+    from app_db.docs_tags import install_docs_tags
+
+    install_docs_tags(conn)
+
+
+@migration("0008_docs_preview_columns", "Precomputed preview_text, word_count and reading_minutes on documentation_pages")
+def _docs_preview_columns(conn):
+    from app_db.docs import backfill_doc_previews
+
+    conn.execute(text("ALTER TABLE documentation_pages ADD COLUMN IF NOT EXISTS preview_text TEXT"))
+    conn.execute(text("ALTER TABLE documentation_pages ADD COLUMN IF NOT EXISTS word_count INTEGER NOT NULL DEFAULT 0"))
+    conn.execute(
+        text("ALTER TABLE documentation_pages ADD COLUMN IF NOT EXISTS reading_minutes INTEGER NOT NULL DEFAULT 0")
+    )
+    backfill_doc_previews(conn)
+
+
+@migration("0009_docs_slug_pattern_index", "text_pattern_ops index on documentation_pages.slug for slug allocation")
+def _docs_slug_pattern_index(conn):
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_documentation_pages_slug_pattern "
+            "ON documentation_pages (slug text_pattern_ops)"
+        )
+    )
@@ -1,7 +1,8 @@
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy.dialects.postgresql import ARRAY
 
 from app_db.base import db
+from app_db.passwords import hash_password, needs_rehash, verify_password
 from app_db.user_roles import normalize_role
 
 
@@ -15,10 +16,13 @@ class User(UserMixin, db.Model):
     def set_password(self, password):
         if password is None or not isinstance(password, str) or not password.strip():
             raise ValueError("Password must be a non-empty string")
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        return needs_rehash(self.password)
 
     def set_role(self, role: str):
         normalized = normalize_role(role)
@@ -27,13 +31,24 @@ class User(UserMixin, db.Model):
 
 class DocumentationPage(db.Model):
     __tablename__ = "documentation_pages"
+    # Keyset pagination, tag lookups and slug allocation (migrations 0006, 0007, 0009 for existing databases).
+    __table_args__ = (
+        db.Index("ix_documentation_pages_updated_at_id", "updated_at", "id"),
+        db.Index("ix_documentation_pages_tags", "tags", postgresql_using="gin"),
+        db.Index("ix_documentation_pages_slug_pattern", "slug", postgresql_ops={"slug": "text_pattern_ops"}),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     slug = db.Column(db.String(220), nullable=False, unique=True, index=True)
     summary = db.Column(db.String(320), nullable=True)
     content_html = db.Column(db.Text, nullable=False)
+    # Derived from summary/content_html on save (app_db.docs.build_doc_preview) for listings.
+    preview_text = db.Column(db.Text, nullable=True)
+    word_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    reading_minutes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     tags_csv = db.Column(db.String(500), nullable=True)
+    tags = db.Column(ARRAY(db.Text), nullable=False, default=list, server_default="{}")
     created_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     created_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
     updated_at = db.Column(
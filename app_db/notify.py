@@ -0,0 +1,133 @@
+"""Cross-process cache invalidation over PostgreSQL LISTEN/NOTIFY.
+
+In-process caches subscribe a handler per topic. publish() runs the local
+handlers immediately and sends a NOTIFY so every other gateway process
+(other workers, other hosts, CLI scripts) drops the same entries. A handler
+receives the payload string; an empty payload means "flush everything",
+which is also sent to all handlers whenever the listener (re)connects,
+because notifications may have been missed while it was down.
+"""
+
+import logging
+import os
+import select
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+
+from app_db.engine import get_sql_engine
+
+CHANNEL = "app_cache_invalidate"
+POLL_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+_handlers: Dict[str, List[Callable[[str], None]]] = {}
+_lock = threading.Lock()
+_listener_pid = None
+_listening = threading.Event()
+_origin = None
+_origin_pid = None
+
+
+def _process_origin() -> str:
+    """Random per-process token so a listener can skip its own notifications."""
+    global _origin, _origin_pid
+    pid = os.getpid()
+    if _origin_pid != pid:
+        _origin = uuid.uuid4().hex[:12]
+        _origin_pid = pid
+    return _origin
+
+
+def subscribe(topic: str, handler: Callable[[str], None]) -> None:
+    with _lock:
+        _handlers.setdefault(topic, []).append(handler)
+
+
+def _dispatch(topic: str, payload: str) -> None:
+    for handler in list(_handlers.get(topic, ())):
+        try:
+            handler(payload)
+        except Exception:
+            logger.exception("Cache invalidation handler failed for topic %r", topic)
+
+
+def _flush_all() -> None:
+    for topic in list(_handlers):
+        _dispatch(topic, "")
+
+
+def publish(topic: str, payload: str = "") -> None:
+    """Invalidate locally, then tell other processes. Never raises on NOTIFY failure."""
+    _dispatch(topic, payload)
+    message = f"{_process_origin()}|{topic}|{payload}"
+    try:
+        with get_sql_engine().begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :message)"), {"channel": CHANNEL, "message": message})
+    except Exception:
+        logger.exception("Could not publish cache invalidation for topic %r", topic)
+
+
+def _handle_message(message: str) -> None:
+    origin, _, rest = message.partition("|")
+    if origin == _process_origin():
+        return
+    topic, _, payload = rest.partition("|")
+    _dispatch(topic, payload)
+
+
+def _listen_forever() -> None:
+    backoff = 1.0
+    while True:
+        raw = None
+        try:
+            raw = get_sql_engine().raw_connection()
+            # Read before detach(): a detached fairy no longer exposes driver_connection.
+            conn = raw.driver_connection
+            raw.detach()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            _listening.set()
+            _flush_all()
+            backoff = 1.0
+            while True:
+                if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _handle_message(conn.notifies.pop(0).payload)
+        except Exception:
+            logger.warning("Cache invalidation listener disconnected; retrying in %.0fs", backoff, exc_info=True)
+        finally:
+            _listening.clear()
+            if raw is not None:
+                try:
+                    raw.close()
+                except Exception:
+                    pass
+        time.sleep(backoff)
+        backoff = min(MAX_BACKOFF_SECONDS, backoff * 2)
+
+
+def ensure_listener() -> None:
+    """Start the LISTEN thread once per process (re-checked after fork)."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        _listening.clear()
+        threading.Thread(target=_listen_forever, name="app-cache-listener", daemon=True).start()
+
+
+def is_listening() -> bool:
+    return _listening.is_set()
@@ -0,0 +1,168 @@
+"""Password hashing on a bounded worker pool with configurable hash parameters.
+
+werkzeug's scrypt/pbkdf2 hashing is deliberately slow. Running it on a small
+pool caps how many hashes run at once per process, so a burst of logins or
+sign ups queues (or is shed) instead of stalling every request thread,
+including /auth-check. hashlib releases the GIL while hashing, so the
+request thread waiting on the pool does not block other threads.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_TIMEOUT_SECONDS = 10.0
+
+
+
+def _prefix_for_method(method: str) -> str:
+    """Method string as werkzeug writes it into hashes, worked out without hashing.
+
+    Follows werkzeug.security's defaults, e.g. 'scrypt' -> 'scrypt:32768:8:1'
+    and 'pbkdf2:sha256' -> 'pbkdf2:sha256:1000000'. ValueError for methods
+    werkzeug would reject.
+    """
+    name, *args = method.split(":")
+    if name == "scrypt":
+        if not args:
+            return "scrypt:32768:8:1"
+        try:
+            n, r, p = map(int, args)
+        except ValueError:
+            raise ValueError("'scrypt' takes 3 arguments.") from None
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2":
+        if len(args) > 2:
+            raise ValueError("'pbkdf2' takes 2 arguments.")
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+_lock = threading.Lock()
+_method = DEFAULT_METHOD
+_method_prefix = _prefix_for_method(DEFAULT_METHOD)
+_max_workers = DEFAULT_MAX_WORKERS
+_max_queue = DEFAULT_MAX_QUEUE
+_timeout_seconds = DEFAULT_TIMEOUT_SECONDS
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_pending = 0
+_stats = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "rehashed": 0, "max_pending": 0}
+_wait_seconds_total = 0.0
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the hashing pool is saturated or a hash did not finish in time."""
+
+
+def configure_password_hasher(
+    *,
+    method: str = DEFAULT_METHOD,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+    timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+) -> None:
+    global _method, _method_prefix, _max_workers, _max_queue, _timeout_seconds, _executor, _executor_pid
+    method = (method or DEFAULT_METHOD).strip()
+    # Raises ValueError at startup for a method werkzeug cannot hash with.
+    prefix = _prefix_for_method(method)
+    with _lock:
+        _method = method
+        _method_prefix = prefix
+        _max_workers = max(1, int(max_workers))
+        _max_queue = max(0, int(max_queue))
+        _timeout_seconds = max(0.1, float(timeout_seconds))
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+        _executor = None
+        _executor_pid = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid, _pending
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        # Worker threads do not survive fork: build a fresh pool per process.
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="password-hash")
+        _executor_pid = pid
+        _pending = 0
+    return _executor
+
+
+def _run_bounded(fn, *args):
+    global _pending, _wait_seconds_total
+    with _lock:
+        if _pending >= _max_workers + _max_queue:
+            _stats["rejected"] += 1
+            raise PasswordHasherBusy("Password hashing queue is full.")
+        executor = _get_executor()
+        _pending += 1
+        _stats["submitted"] += 1
+        _stats["max_pending"] = max(_stats["max_pending"], _pending)
+
+    def _task():
+        global _pending
+        try:
+            return fn(*args)
+        finally:
+            with _lock:
+                _pending -= 1
+                _stats["completed"] += 1
+
+    started = time.perf_counter()
+    future = executor.submit(_task)
+    try:
+        return future.result(timeout=_timeout_seconds)
+    except FutureTimeoutError:
+        with _lock:
+            _stats["timeouts"] += 1
+        raise PasswordHasherBusy("Password hashing timed out.") from None
+    finally:
+        with _lock:
+            _wait_seconds_total += time.perf_counter() - started
+
+
+def hash_password(password: str) -> str:
+    return _run_bounded(generate_password_hash, password, _method)
+
+
+def verify_password(stored_hash: str, password: str) -> bool:
+    if not stored_hash:
+        return False
+    return _run_bounded(check_password_hash, stored_hash, password)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True when stored_hash was made with other parameters than the configured method."""
+    if not stored_hash or "$" not in stored_hash:
+        return True
+    return stored_hash.split("$", 1)[0] != _method_prefix
+
+
+def record_rehash() -> None:
+    with _lock:
+        _stats["rehashed"] += 1
+
+
+def password_hasher_stats() -> Dict[str, object]:
+    with _lock:
+        return {
+            **_stats,
+            "pending": _pending,
+            "in_flight": min(_pending, _max_workers),
+            "queued": max(0, _pending - _max_workers),
+            "max_workers": _max_workers,
+            "max_queue": _max_queue,
+            "wait_seconds_total": round(_wait_seconds_total, 3),
+            "method": _method,
+        }
@@ -0,0 +1,130 @@
+"""In-process principal cache: user id -> (id, username, role) for hot auth paths.
+
+Used by the Flask-Login user loader, so an authenticated request (including
+nginx's /auth-check subrequests) does not load the full User row (password
+hash included). Each user id has a version counter; invalidate_principal() bumps
+it after a write so a load racing with the write can never re-insert stale
+data, and publishes the change to other processes via app_db.notify.
+Entries also expire after a TTL as a safety net.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+
+from app_db import notify
+from app_db.engine import get_sql_engine
+
+DEFAULT_TTL_SECONDS = 30.0
+NOTIFY_TOPIC = "principal"
+
+_lock = threading.Lock()
+_entries: Dict[int, "Principal"] = {}
+_versions: Dict[int, int] = {}
+_epoch = 0  # bumped by a flush-all so in-flight loads for any user are discarded
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_ttl_seconds = DEFAULT_TTL_SECONDS
+
+
+class Principal:
+    """Minimal authenticated identity usable as Flask-Login's current_user.
+
+    Carries no password hash; routes that need to verify or change the
+    password load the full User row explicitly.
+    """
+
+    __slots__ = ("id", "username", "role", "version", "expires_at")
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, id: int, username: str, role: str, version=None, expires_at: float = 0.0):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.version = version
+        self.expires_at = expires_at
+
+    def get_id(self) -> str:
+        return str(self.id)
+
+    def __repr__(self) -> str:
+        return f"<Principal {self.id} {self.username!r} role={self.role!r}>"
+
+
+def configure_principal_cache(*, ttl_seconds: float) -> None:
+    global _ttl_seconds
+    _ttl_seconds = max(0.0, float(ttl_seconds))
+
+
+def _load_principal(user_id: int) -> Optional[Principal]:
+    # Own connection: the request's REPEATABLE READ snapshot may predate the
+    # invalidation that bumped the version, and would cache stale rows under it.
+    with get_sql_engine().connect() as conn:
+        row = conn.execute(
+            text('SELECT id, username, role FROM "user" WHERE id = :user_id'),
+            {"user_id": user_id},
+        ).fetchone()
+    if not row:
+        return None
+    return Principal(row[0], row[1], row[2] or "viewer")
+
+
+def get_principal(user_id: int) -> Optional[Principal]:
+    """Return the cached principal for user_id, loading it on miss. None if the user is gone."""
+    now = time.monotonic()
+    with _lock:
+        version = (_epoch, _versions.get(user_id, 0))
+        cached = _entries.get(user_id)
+        if cached is not None and cached.version == version and cached.expires_at > now:
+            _stats["hits"] += 1
+            return cached
+        _stats["misses"] += 1
+
+    principal = _load_principal(user_id)
+    if principal is None:
+        return None
+
+    principal.version = version
+    principal.expires_at = now + _ttl_seconds
+    with _lock:
+        # A concurrent invalidation bumped the version: keep the fresh row for
+        # this request but do not cache it.
+        if (_epoch, _versions.get(user_id, 0)) == version:
+            _entries[user_id] = principal
+    return principal
+
+
+def _invalidate_local(user_id: Optional[int]) -> None:
+    global _epoch
+    with _lock:
+        if user_id is None:
+            _epoch += 1
+            _entries.clear()
+        else:
+            _versions[user_id] = _versions.get(user_id, 0) + 1
+            _entries.pop(user_id, None)
+        _stats["invalidations"] += 1
+
+
+def _on_notify(payload: str) -> None:
+    _invalidate_local(int(payload) if payload else None)
+
+
+def invalidate_principal(user_id: Optional[int] = None) -> None:
+    """Drop one cached principal (or all when user_id is None) in every process.
+
+    Call after the transaction that changed the user row has committed.
+    """
+    notify.publish(NOTIFY_TOPIC, "" if user_id is None else str(int(user_id)))
+
+
+def principal_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "size": len(_entries)}
+
+
+notify.subscribe(NOTIFY_TOPIC, _on_notify)
@@ -0,0 +1,91 @@
+"""In-process tag catalog: every doc tag with the number of docs using it.
+
+Feeds the docs index filter bar and the editor's tag autocomplete, which
+otherwise unnest every row's tags on each render. Tags only change when a
+doc is saved or deleted; those paths call invalidate_tag_catalog() after
+committing, which drops the catalog here and, via app_db.notify, in every
+other gateway process. A version counter keeps a load that raced with an
+invalidation from caching stale data; the TTL is a safety net for writes
+that bypass the app (seed scripts, manual SQL).
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app_db import notify
+from app_db.engine import get_sql_engine
+
+DEFAULT_TTL_SECONDS = 300.0
+NOTIFY_TOPIC = "tags"
+
+_lock = threading.Lock()
+_catalog: Optional[List[Dict[str, object]]] = None
+_expires_at = 0.0
+_version = 0
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_ttl_seconds = DEFAULT_TTL_SECONDS
+
+
+def configure_tag_catalog(*, ttl_seconds: float) -> None:
+    global _ttl_seconds
+    _ttl_seconds = max(0.0, float(ttl_seconds))
+
+
+def _load_catalog() -> List[Dict[str, object]]:
+    # Not read_connection(): a GET's snapshot can be older than the last tag
+    # invalidation, and the result is cached for every later request.
+    with get_sql_engine().connect() as conn:
+        rows = conn.execute(
+            text(
+                """
+                SELECT tag, count(*) AS uses
+                FROM documentation_pages, LATERAL unnest(tags) AS tag
+                GROUP BY tag
+                ORDER BY tag
+                """
+            )
+        ).fetchall()
+    return [{"tag": row[0], "count": int(row[1])} for row in rows]
+
+
+def get_tag_catalog() -> List[Dict[str, object]]:
+    """[{"tag", "count"}] sorted by tag; cached until a doc save/delete invalidates it."""
+    global _catalog, _expires_at
+    now = time.monotonic()
+    with _lock:
+        if _catalog is not None and _expires_at > now:
+            _stats["hits"] += 1
+            return _catalog
+        _stats["misses"] += 1
+        version = _version
+
+    catalog = _load_catalog()
+    with _lock:
+        if _version == version:
+            _catalog = catalog
+            _expires_at = now + _ttl_seconds
+    return catalog
+
+
+def _invalidate_local(_payload: str = "") -> None:
+    global _catalog, _version
+    with _lock:
+        _version += 1
+        _catalog = None
+        _stats["invalidations"] += 1
+
+
+def invalidate_tag_catalog() -> None:
+    """Drop the catalog in every process. Call after the doc write has committed."""
+    notify.publish(NOTIFY_TOPIC)
+
+
+def tag_catalog_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "size": len(_catalog or ())}
+
+
+notify.subscribe(NOTIFY_TOPIC, _invalidate_local)
@@ -0,0 +1,113 @@
+"""pg_trgm support: trigram GIN indexes for substring and typo-tolerant lookups.
+
+A GIN index with gin_trgm_ops serves `col LIKE/ILIKE '%term%'` and the
+word-similarity operator `term <% col`, neither of which a B-tree can use.
+
+Docs title/slug indexes come from schema migration 0005. The dummydata
+table is not part of the schema, so its indexes are an explicit ops step,
+`python3 scripts/create_dummydata_trigram_indexes.py`, built CONCURRENTLY
+so the table stays writable meanwhile. CREATE EXTENSION needs a privileged
+role. Without it, both log a warning and skip their indexes, and
+trigram_available() stays False, so callers fall back to their non-trigram
+queries. To enable it later, run `CREATE EXTENSION pg_trgm;` as a superuser
+and then `python3 scripts/reindex_docs_search.py --trigram`.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app_db.engine import get_sql_engine
+from app_db.unit_of_work import read_connection
+
+RECHECK_SECONDS = 300.0
+DUMMYDATA_TRIGRAM_INDEXES = {"ix_dummydata_name_trgm": "name", "ix_dummydata_email_trgm": "email"}
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_available: Optional[bool] = None
+_checked_at = 0.0
+
+
+def create_trigram_extension(conn) -> bool:
+    """CREATE EXTENSION pg_trgm inside a savepoint; False (and logged) when not permitted."""
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        return True
+    except DBAPIError as exc:
+        logger.warning("pg_trgm is not available (%s); trigram indexes skipped.", exc.orig)
+        return False
+
+
+def install_docs_trigram_indexes(conn) -> bool:
+    """Trigram indexes for documentation_pages title/slug lookups. Schema migration 0005."""
+    if not create_trigram_extension(conn):
+        return False
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_documentation_pages_title_trgm "
+            "ON documentation_pages USING GIN (lower(title) gin_trgm_ops)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_documentation_pages_slug_trgm "
+            "ON documentation_pages USING GIN (slug gin_trgm_ops)"
+        )
+    )
+    return True
+
+
+def install_dummydata_trigram_indexes() -> bool:
+    """Trigram indexes for the dummydata name/email search, built CONCURRENTLY.
+
+    False when the table or pg_trgm is missing. An index left INVALID by an
+    interrupted build is dropped and rebuilt.
+    """
+    engine = get_sql_engine()
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT to_regclass('public.dummydata')")).scalar() is None:
+            return False
+        if not create_trigram_extension(conn):
+            return False
+    # CONCURRENTLY cannot run inside a transaction block.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index_name, column in DUMMYDATA_TRIGRAM_INDEXES.items():
+            valid = conn.execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index AS i "
+                    "WHERE i.indexrelid = to_regclass(:index_name)"
+                ),
+                {"index_name": f"public.{index_name}"},
+            ).scalar()
+            if valid is False:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+            conn.execute(
+                text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} "
+                    f"ON dummydata USING GIN ({column} gin_trgm_ops)"
+                )
+            )
+    return True
+
+
+def trigram_available() -> bool:
+    """Whether pg_trgm is installed; checked once per process (re-checked while missing)."""
+    global _available, _checked_at
+    now = time.monotonic()
+    if _available or (_available is not None and now - _checked_at < RECHECK_SECONDS):
+        return bool(_available)
+    with read_connection() as conn:
+        installed = bool(
+            conn.execute(text("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")).scalar()
+        )
+    with _lock:
+        _available = installed
+        _checked_at = now
+    return installed
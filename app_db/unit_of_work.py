@@ -0,0 +1,79 @@
+"""Request-scoped connection shared by app_db helpers and the ORM session.
+
+Inside a Flask app context, read_connection() and write_transaction() hand
+out the Flask-SQLAlchemy session's connection, so every helper used by one
+request (docs listing, facets, ORM queries) runs on a single pooled
+connection that Flask-SQLAlchemy releases at app-context teardown. The
+versioned caches (principals, settings, tag catalog) load on a connection
+of their own, so they never fill from the request's older snapshot.
+Outside Flask (Streamlit pages, scripts) each call checks out a connection
+of its own, as before.
+
+With configure_read_snapshot(True), connections opened during GET/HEAD
+requests run at REPEATABLE READ, so a page sees one consistent snapshot
+(e.g. a listing's count and rows agree). The level is set through the
+connection's execution options before its transaction begins; the pool
+resets it on checkin.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask import has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app_db.base import db
+from app_db.engine import get_sql_engine
+
+READ_ONLY_METHODS = ("GET", "HEAD")
+
+_read_snapshot = False
+
+
+def configure_read_snapshot(enabled: bool) -> None:
+    global _read_snapshot
+    _read_snapshot = bool(enabled)
+
+
+@event.listens_for(Engine, "engine_connect")
+def _begin_read_snapshot(connection):
+    if not _read_snapshot or not has_request_context() or request.method not in READ_ONLY_METHODS:
+        return
+    if connection.dialect.name == "postgresql" and not connection.in_transaction():
+        connection.execution_options(isolation_level="REPEATABLE READ")
+
+
+@contextmanager
+def read_connection() -> Iterator[Connection]:
+    """Connection for queries; the request's shared one when in an app context."""
+    if not has_app_context():
+        with get_sql_engine().connect() as conn:
+            yield conn
+        return
+    try:
+        yield db.session.connection()
+    except SQLAlchemyError:
+        # Leave the shared transaction usable for the rest of the request.
+        db.session.rollback()
+        raise
+
+
+@contextmanager
+def write_transaction() -> Iterator[Connection]:
+    """Connection whose work is committed on success and rolled back on error.
+
+    In an app context this commits the request's session, including any
+    pending ORM changes.
+    """
+    if not has_app_context():
+        with get_sql_engine().begin() as conn:
+            yield conn
+        return
+    try:
+        yield db.session.connection()
+        db.session.commit()
+    except BaseException:
+        db.session.rollback()
+        raise
@@ -17,25 +17,29 @@ def normalize_role(value: str) -> str:
 
 
 
-def ensure_user_role_column():
-    with get_sql_engine().begin() as conn:
-        conn.execute(
-            text(
-                '''
-                ALTER TABLE IF EXISTS "user"
-                ADD COLUMN IF NOT EXISTS role VARCHAR(32)
-                '''
-            )
-        )
-        conn.execute(
-            text(
-                '''
-                UPDATE "user"
-                SET role = :default_role
-                WHERE role IS NULL OR btrim(role) = ''
-                '''
-            ),
-            {
-                "default_role": DEFAULT_ROLE,
-            },
+def ensure_user_role_column(conn=None):
+    """Add/backfill user.role. Runs as schema migration 0002; pass conn to join its transaction."""
+    if conn is None:
+        with get_sql_engine().begin() as own_conn:
+            ensure_user_role_column(own_conn)
+        return
+    conn.execute(
+        text(
+            '''
+            ALTER TABLE IF EXISTS "user"
+            ADD COLUMN IF NOT EXISTS role VARCHAR(32)
+            '''
         )
+    )
+    conn.execute(
+        text(
+            '''
+            UPDATE "user"
+            SET role = :default_role
+            WHERE role IS NULL OR btrim(role) = ''
+            '''
+        ),
+        {
+            "default_role": DEFAULT_ROLE,
+        },
+    )
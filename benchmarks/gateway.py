@@ -0,0 +1,148 @@
+"""In-process benchmarks of the Flask gateway hot paths.
+
+Requests go through Flask's test client, so the numbers cover routing,
+auth, queries and template rendering without network or nginx noise (see
+benchmarks/loadtest.py for end-to-end load). Needs a PostgreSQL database in
+DATABASE_URL (or DB_*); bench data is seeded automatically.
+
+    python -m benchmarks.gateway                         # run, print, write benchmarks/results.json
+    python -m benchmarks.gateway -o baseline.json        # save a baseline
+    python -m benchmarks.gateway --compare baseline.json # exit 1 on regressions
+"""
+
+import argparse
+import fnmatch
+import os
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmarks hammer /login from one client: keep the throttle out of the numbers.
+os.environ.setdefault("AUTH_RATE_LIMIT_IP", "0")
+os.environ.setdefault("AUTH_RATE_LIMIT_USERNAME", "0")
+
+from benchmarks import seed
+from benchmarks.harness import compare, measure, print_table, write_results
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.json")
+DUMMYDATA_SIZES = (10_000, 100_000)
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[[], None]
+    iterations: int
+    setup: Optional[Callable[[], None]] = None
+
+
+def _login(app, username):
+    client = app.test_client()
+    response = client.post("/login", data={"username": username, "password": seed.BENCH_PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f"Benchmark login as {username} failed ({response.status_code}).")
+    return client
+
+
+def _get(client, path, expected=200):
+    def run():
+        response = client.get(path)
+        if response.status_code != expected:
+            raise RuntimeError(f"GET {path} returned {response.status_code}, expected {expected}.")
+
+    return run
+
+
+def build_cases(app, args):
+    """Cases in run order; each dummydata size is seeded just before its case."""
+    from app_db import get_all_tags, list_documents
+
+    anonymous = app.test_client()
+    viewer = _login(app, seed.VIEWER_USERNAME)
+    admin = _login(app, seed.ADMIN_USERNAME)
+    n = args.iterations
+
+    def login_post():
+        response = app.test_client().post(
+            "/login", data={"username": seed.VIEWER_USERNAME, "password": seed.BENCH_PASSWORD}
+        )
+        if response.status_code != 302:
+            raise RuntimeError(f"POST /login returned {response.status_code}.")
+
+    def direct(fn, **kwargs):
+        def run():
+            with app.app_context():
+                fn(**kwargs)
+
+        return run
+
+    cases = [
+        Case("auth_check.anonymous", _get(anonymous, "/auth-check", expected=401), n),
+        Case("auth_check.authenticated", _get(viewer, "/auth-check"), n),
+        Case("login.post", login_post, max(5, n // 10)),
+        Case("docs.index", _get(viewer, "/docs"), n),
+        Case("docs.index.search", _get(viewer, "/docs?q=consectetur"), n),
+        Case("docs.index.tags", _get(viewer, "/docs?tags=alpha&tags=gamma"), n),
+        Case("docs.index.tags_all", _get(viewer, "/docs?tags=alpha&tags=gamma&match=all"), n),
+        Case("docs.index.search_tags", _get(viewer, "/docs?q=document&tags=beta"), n),
+        Case("docs.view", _get(viewer, "/docs/bench-doc-42"), n),
+        Case("admin.index", _get(admin, "/admin"), n),
+        Case("db.list_documents", direct(list_documents), n),
+        Case("db.list_documents.search", direct(list_documents, search="consectetur"), n),
+        Case("db.list_documents.facets", direct(list_documents, facets=True), n),
+        Case("db.get_all_tags", direct(get_all_tags), n),
+    ]
+    for size in DUMMYDATA_SIZES:
+        cases.append(
+            Case(
+                f"dummydata.list.{size // 1000}k",
+                _get(viewer, "/dummydata-crud"),
+                max(3, n // 10),
+                setup=lambda rows=size: seed.seed_dummydata(rows),
+            )
+        )
+    return cases
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Flask gateway hot paths in-process.")
+    parser.add_argument("--iterations", "-n", type=int, default=50, help="Timed iterations per case (default: 50).")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed iterations per case (default: 3).")
+    parser.add_argument("--only", default="*", help="Glob on case names, e.g. 'docs.*' (default: all).")
+    parser.add_argument("--output", "-o", default=DEFAULT_OUTPUT, help="Results JSON path.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare medians with a saved results JSON.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="Median slowdown counted as a regression (default: 0.10)."
+    )
+    parser.add_argument("--users", type=int, default=500, help="Extra users seeded for /admin (default: 500).")
+    parser.add_argument("--docs", type=int, default=2000, help="Docs seeded (default: 2000).")
+    args = parser.parse_args()
+
+    from auth_server import app
+
+    app.config["WTF_CSRF_ENABLED"] = False
+    seed.seed_users(args.users)
+    seed.seed_docs(args.docs)
+
+    results = []
+    for case in build_cases(app, args):
+        if not fnmatch.fnmatch(case.name, args.only):
+            continue
+        if case.setup is not None:
+            case.setup()
+        print(f"running {case.name} ...", flush=True)
+        results.append(measure(case.name, case.run, iterations=case.iterations, warmup=args.warmup))
+
+    print()
+    print_table(results)
+    write_results(args.output, results, meta={"users": args.users, "docs": args.docs, "only": args.only})
+    print(f"\nWrote {args.output}")
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Timing loop, JSON results and baseline comparison shared by the benchmarks."""
+
+import json
+import platform
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class BenchResult:
+    name: str
+    iterations: int
+    min_ms: float
+    median_ms: float
+    p95_ms: float
+    mean_ms: float
+    ops_per_sec: float
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def measure(name: str, fn: Callable[[], object], *, iterations: int, warmup: int) -> BenchResult:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    mean_ms = statistics.fmean(timings)
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        min_ms=round(timings[0], 3),
+        median_ms=round(statistics.median(timings), 3),
+        p95_ms=round(percentile(timings, 0.95), 3),
+        mean_ms=round(mean_ms, 3),
+        ops_per_sec=round(1000 / mean_ms, 1) if mean_ms else 0.0,
+    )
+
+
+def write_results(path: str, results: List[BenchResult], meta: Optional[Dict[str, object]] = None) -> None:
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "meta": meta or {},
+        "results": [asdict(result) for result in results],
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2)
+        handle.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    with open(path, encoding="utf-8") as handle:
+        payload = json.load(handle)
+    return {item["name"]: item for item in payload["results"]}
+
+
+def print_table(results: List[BenchResult]) -> None:
+    width = max((len(result.name) for result in results), default=10)
+    print(f"{'benchmark':<{width}}  {'median ms':>10}  {'p95 ms':>10}  {'ops/s':>9}")
+    for result in results:
+        print(f"{result.name:<{width}}  {result.median_ms:>10.3f}  {result.p95_ms:>10.3f}  {result.ops_per_sec:>9.1f}")
+
+
+def compare(results: List[BenchResult], baseline_path: str, threshold: float) -> int:
+    """Print median deltas against a saved run; return how many got slower than threshold."""
+    baseline = load_results(baseline_path)
+    regressions = 0
+    width = max((len(result.name) for result in results), default=10)
+    print(f"\nCompared with {baseline_path} (regression threshold {threshold:.0%}):")
+    for result in results:
+        previous = baseline.get(result.name)
+        if previous is None or not previous.get("median_ms"):
+            print(f"{result.name:<{width}}  new")
+            continue
+        change = result.median_ms / previous["median_ms"] - 1
+        marker = ""
+        if change > threshold:
+            marker = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            marker = "  faster"
+        print(f"{result.name:<{width}}  {previous['median_ms']:>10.3f} -> {result.median_ms:>10.3f} ms  {change:+.1%}{marker}")
+    return regressions
@@ -0,0 +1,205 @@
+"""End-to-end load generator for the running stack (urllib + threads, headless).
+
+Each virtual user logs in through /login (fetching the CSRF token from the
+form first, like a browser), then loops over a dashboard session: the docs
+listing, a search, a doc page, the Streamlit iframe page, and a burst of
+/auth-check calls, the subrequest nginx makes for every Streamlit asset and
+websocket. Concurrency is ramped through --stages (e.g. 1,5,10,25), holding
+each for --stage-seconds. Every stage reports p50/p95/p99 latency,
+throughput and error rate per endpoint, so you can see where latency starts
+climbing for a given worker count.
+
+    python run.py                       # or run.py --prod; start the target with AUTH_RATE_LIMIT_IP=0
+    python -m benchmarks.seed --users 100
+    python -m benchmarks.loadtest --stages 1,5,10,25 --stage-seconds 30 -o loadtest.json
+
+Virtual users log in as bench_user_1..N (password from benchmarks.seed).
+All of them come from 127.0.0.1, so start the target with
+AUTH_RATE_LIMIT_IP=0 or the logins will be throttled (reported as 429s).
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import percentile
+from benchmarks.seed import BENCH_PASSWORD
+
+CSRF_RE = re.compile(r'name="csrf_token"\s+value="([^"]+)"')
+DOC_LINK_RE = re.compile(r'href="/docs/(bench-doc-\d+)"')
+SEARCH_TERMS = ("lorem", "consectetur", "document", "fermentum", "posuere")
+
+
+class Recorder:
+    """Thread-safe latency samples and error counts per (stage, endpoint)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[tuple, List[float]] = defaultdict(list)
+        self.errors: Dict[tuple, int] = defaultdict(int)
+
+    def add(self, stage: int, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[(stage, endpoint)].append(seconds * 1000)
+            if not ok:
+                self.errors[(stage, endpoint)] += 1
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, base_url, recorder, stage_ref, stop_event, auth_checks, think_seconds):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.username = f"bench_user_{index}"
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.stage_ref = stage_ref
+        self.stop_event = stop_event
+        self.auth_checks = auth_checks
+        self.think_seconds = think_seconds
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        self.doc_slugs: List[str] = []
+
+    def request(self, endpoint, path, data=None, expected=(200,)):
+        """Time one request; returns the body text ('' on failure)."""
+        body = None if data is None else urllib.parse.urlencode(data).encode("utf-8")
+        started = time.perf_counter()
+        status = 0
+        text = ""
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=30) as response:
+                status = response.status
+                text = response.read().decode("utf-8", errors="replace")
+        except urllib.error.HTTPError as exc:
+            status = exc.code
+            exc.read()
+        except OSError:
+            status = 0
+        self.recorder.add(self.stage_ref[0], endpoint, time.perf_counter() - started, status in expected)
+        return text if status in expected else ""
+
+    def login(self) -> bool:
+        page = self.request("GET /login", "/login")
+        match = CSRF_RE.search(page)
+        if not match:
+            return False
+        self.request(
+            "POST /login",
+            "/login",
+            data={"username": self.username, "password": BENCH_PASSWORD, "csrf_token": match.group(1)},
+        )
+        return bool(self.request("GET /auth-check", "/auth-check"))
+
+    def session_loop(self) -> None:
+        listing = self.request("GET /docs", "/docs")
+        self.doc_slugs = DOC_LINK_RE.findall(listing) or self.doc_slugs
+        self.request("GET /docs?q=", "/docs?" + urllib.parse.urlencode({"q": random.choice(SEARCH_TERMS)}))
+        if self.doc_slugs:
+            self.request("GET /docs/<slug>", f"/docs/{random.choice(self.doc_slugs)}")
+        self.request("GET /iframe-app-streamlit", "/iframe-app-streamlit")
+        for _ in range(self.auth_checks):
+            self.request("GET /auth-check", "/auth-check")
+        if self.think_seconds:
+            self.stop_event.wait(random.uniform(0, 2 * self.think_seconds))
+
+    def run(self) -> None:
+        while not self.stop_event.is_set() and not self.login():
+            self.stop_event.wait(1.0)
+        while not self.stop_event.is_set():
+            self.session_loop()
+
+
+def summarize(recorder: Recorder, stages: List[int], stage_seconds: Dict[int, float]) -> List[Dict[str, object]]:
+    rows = []
+    for (stage, endpoint), samples in sorted(recorder.latencies.items()):
+        samples = sorted(samples)
+        elapsed = stage_seconds.get(stage) or 1.0
+        errors = recorder.errors.get((stage, endpoint), 0)
+        rows.append(
+            {
+                "users": stages[stage],
+                "endpoint": endpoint,
+                "requests": len(samples),
+                "rps": round(len(samples) / elapsed, 1),
+                "error_rate": round(errors / len(samples), 4),
+                "p50_ms": round(percentile(samples, 0.50), 1),
+                "p95_ms": round(percentile(samples, 0.95), 1),
+                "p99_ms": round(percentile(samples, 0.99), 1),
+            }
+        )
+    return rows
+
+
+def print_summary(rows: List[Dict[str, object]]) -> None:
+    width = max((len(row["endpoint"]) for row in rows), default=10)
+    header = f"{'users':>5}  {'endpoint':<{width}}  {'reqs':>7}  {'req/s':>7}  {'err%':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['users']:>5}  {row['endpoint']:<{width}}  {row['requests']:>7}  {row['rps']:>7.1f}  "
+            f"{row['error_rate'] * 100:>5.1f}%  {row['p50_ms']:>8.1f}  {row['p95_ms']:>8.1f}  {row['p99_ms']:>8.1f}"
+        )
+
+
+def main() -> int:
+    flask_port = int(os.environ.get("FLASK_PORT", "5001"))
+    parser = argparse.ArgumentParser(description="Ramp logged-in virtual users against the running gateway.")
+    parser.add_argument("--base-url", default=f"http://127.0.0.1:{flask_port}", help="Gateway URL (default: local Flask).")
+    parser.add_argument("--stages", default="1,5,10,25", help="Concurrent users per stage (default: 1,5,10,25).")
+    parser.add_argument("--stage-seconds", type=float, default=30, help="Duration of each stage (default: 30).")
+    parser.add_argument("--auth-checks", type=int, default=10, help="/auth-check calls per session loop (default: 10).")
+    parser.add_argument("--think", type=float, default=0.5, help="Mean think time between loops in seconds (default: 0.5).")
+    parser.add_argument("--output", "-o", help="Write the per-stage summary as JSON.")
+    args = parser.parse_args()
+
+    stages = [int(value) for value in args.stages.split(",") if value.strip()]
+    recorder = Recorder()
+    stage_ref = [0]
+    stop_event = threading.Event()
+    users: List[VirtualUser] = []
+    stage_seconds: Dict[int, float] = {}
+
+    for stage_index, target in enumerate(stages):
+        stage_ref[0] = stage_index
+        while len(users) < target:
+            user = VirtualUser(
+                len(users) + 1, args.base_url, recorder, stage_ref, stop_event, args.auth_checks, args.think
+            )
+            users.append(user)
+            user.start()
+        print(f"stage {stage_index + 1}/{len(stages)}: {target} users for {args.stage_seconds:.0f}s", flush=True)
+        started = time.perf_counter()
+        time.sleep(args.stage_seconds)
+        stage_seconds[stage_index] = time.perf_counter() - started
+
+    stop_event.set()
+    for user in users:
+        user.join(timeout=35)
+
+    rows = summarize(recorder, stages, stage_seconds)
+    print()
+    print_summary(rows)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"base_url": args.base_url, "stages": stages, "results": rows}, handle, indent=2)
+            handle.write("\n")
+        print(f"\nWrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
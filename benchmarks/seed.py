@@ -0,0 +1,163 @@
+"""Idempotent benchmark data: users, docs and dummydata rows.
+
+Everything seeded here is recognisable by a "bench" prefix (usernames
+bench_*, slugs bench-doc-*, dummydata names bench-*) so it can be removed
+with `python -m benchmarks.seed --drop`. Seeding is bulk SQL, so reaching
+100k dummydata rows takes seconds, not minutes.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app_db import get_sql_engine
+from app_db.docs import backfill_doc_previews
+from app_db.migrations import run_migrations
+from app_db.passwords import hash_password
+
+BENCH_PASSWORD = "bench-password"
+ADMIN_USERNAME = "bench_admin"
+VIEWER_USERNAME = "bench_viewer"
+BENCH_TAGS = ("alpha", "beta", "gamma", "delta", "epsilon", "zeta", "eta", "theta")
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. Integer posuere erat a ante venenatis "
+    "dapibus posuere velit aliquet. Maecenas faucibus mollis interdum. Donec ullamcorper nulla non "
+    "metus auctor fringilla. Cras mattis consectetur purus sit amet fermentum. "
+)
+
+
+def seed_users(extra_users: int) -> None:
+    """bench_admin and bench_viewer (password BENCH_PASSWORD) plus extra viewers for /admin."""
+    stored_hash = hash_password(BENCH_PASSWORD)
+    with get_sql_engine().begin() as conn:
+        for username, role in ((ADMIN_USERNAME, "admin"), (VIEWER_USERNAME, "viewer")):
+            conn.execute(
+                text(
+                    """
+                    INSERT INTO "user" (username, email, password, role)
+                    VALUES (:username, :email, :password, :role)
+                    ON CONFLICT (username) DO UPDATE SET password = :password, role = :role
+                    """
+                ),
+                {"username": username, "email": f"{username}@bench.local", "password": stored_hash, "role": role},
+            )
+        conn.execute(
+            text(
+                """
+                INSERT INTO "user" (username, email, password, role)
+                SELECT 'bench_user_' || n, 'bench_user_' || n || '@bench.local', :password, 'viewer'
+                FROM generate_series(1, :count) AS n
+                ON CONFLICT (username) DO NOTHING
+                """
+            ),
+            {"password": stored_hash, "count": extra_users},
+        )
+
+
+def seed_docs(count: int) -> None:
+    """count docs with 1-3 tags each from BENCH_TAGS and a few paragraphs of HTML."""
+    with get_sql_engine().begin() as conn:
+        author_id = conn.execute(
+            text('SELECT id FROM "user" WHERE username = :username'), {"username": ADMIN_USERNAME}
+        ).scalar_one()
+        conn.execute(
+            text(
+                """
+                INSERT INTO documentation_pages (title, slug, summary, content_html, tags_csv, tags, created_by)
+                SELECT
+                    'Bench document ' || n,
+                    'bench-doc-' || n,
+                    CASE WHEN n % 3 = 0 THEN NULL ELSE 'Summary for bench document ' || n END,
+                    repeat('<p>' || :lorem || 'Document ' || n || '.</p>', 1 + n % 8),
+                    array_to_string(tags, ','),
+                    tags,
+                    :author_id
+                FROM (
+                    SELECT n, ARRAY(
+                        SELECT DISTINCT tag
+                        FROM unnest(ARRAY[
+                            (:tags)[1 + n % 8],
+                            (:tags)[1 + (n / 8) % 8],
+                            CASE WHEN n % 5 = 0 THEN (:tags)[1 + (n / 64) % 8] END
+                        ]) AS tag
+                        WHERE tag IS NOT NULL
+                        ORDER BY tag
+                    ) AS tags
+                    FROM generate_series(1, :count) AS n
+                ) AS generated
+                ON CONFLICT (slug) DO NOTHING
+                """
+            ),
+            {"lorem": LOREM, "tags": list(BENCH_TAGS), "author_id": author_id, "count": count},
+        )
+        backfill_doc_previews(conn)
+
+
+def seed_dummydata(rows: int) -> None:
+    """Top up dummydata to at least `rows` bench rows (never deletes)."""
+    with get_sql_engine().begin() as conn:
+        conn.execute(
+            text(
+                """
+                CREATE TABLE IF NOT EXISTS public.dummydata (
+                    id serial NOT NULL PRIMARY KEY,
+                    name text NOT NULL,
+                    email text NOT NULL,
+                    created_at timestamp without time zone NULL DEFAULT now()
+                )
+                """
+            )
+        )
+        existing = conn.execute(text("SELECT count(*) FROM dummydata WHERE name LIKE 'bench-%'")).scalar_one()
+        if existing >= rows:
+            return
+        conn.execute(
+            text(
+                """
+                INSERT INTO dummydata (name, email)
+                SELECT 'bench-' || n, 'bench-' || n || '@bench.local'
+                FROM generate_series(:start, :stop) AS n
+                """
+            ),
+            {"start": existing + 1, "stop": rows},
+        )
+
+
+def drop_seed() -> None:
+    with get_sql_engine().begin() as conn:
+        conn.execute(text("DELETE FROM documentation_pages WHERE slug LIKE 'bench-doc-%'"))
+        conn.execute(text("DELETE FROM \"user\" WHERE username LIKE 'bench\\_%'"))
+        if conn.execute(text("SELECT to_regclass('public.dummydata')")).scalar_one() is not None:
+            conn.execute(text("DELETE FROM dummydata WHERE name LIKE 'bench-%'"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed (or remove) benchmark data in the configured database.")
+    parser.add_argument("--users", type=int, default=500, help="Extra viewer accounts (default: 500).")
+    parser.add_argument("--docs", type=int, default=2000, help="Documentation pages (default: 2000).")
+    parser.add_argument("--dummydata", type=int, default=10000, help="dummydata rows (default: 10000).")
+    parser.add_argument("--drop", action="store_true", help="Delete all bench data instead of seeding.")
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_seed()
+        print("Removed benchmark data.")
+        return 0
+    run_migrations()
+    seed_users(args.users)
+    seed_docs(args.docs)
+    seed_dummydata(args.dummydata)
+    print(
+        f"Seeded {args.users} extra users, {args.docs} docs, {args.dummydata} dummydata rows "
+        f"(login: {ADMIN_USERNAME} / {BENCH_PASSWORD})."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
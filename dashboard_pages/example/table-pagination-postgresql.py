@@ -3,21 +3,33 @@ import pandas as pd
 import streamlit as st
 from sqlalchemy import text
 from app_db import get_sql_engine
+from app_db.trigram import trigram_available
 
 PAGE_SIZE = 20
 
+# ILIKE '%...%' plus word similarity (typos, partial words); with pg_trgm both
+# are served by the GIN indexes from scripts/create_dummydata_trigram_indexes.py.
+TRIGRAM_MATCH = """
+    name ILIKE :search OR email ILIKE :search
+    OR :term <% name OR :term <% email
+"""
+TRIGRAM_RANK = "GREATEST(word_similarity(:term, name), word_similarity(:term, email))"
+PLAIN_MATCH = "name ILIKE :search OR email ILIKE :search"
+
+
+def search_params(search: str) -> dict:
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return {"search": f"%{escaped}%", "term": search}
+
+
 @st.cache_data(ttl=60)
 def get_total_rows(search: str | None):
     with get_sql_engine().connect() as conn:
         if search:
+            match_sql = TRIGRAM_MATCH if trigram_available() else PLAIN_MATCH
             result = conn.execute(
-                text("""
-                    SELECT COUNT(*)
-                    FROM dummydata
-                    WHERE name ILIKE :search
-                       OR email ILIKE :search
-                """),
-                {"search": f"%{search}%"},
+                text(f"SELECT COUNT(*) FROM dummydata WHERE {match_sql}"),
+                search_params(search),
             )
         else:
             result = conn.execute(
@@ -33,17 +45,20 @@ def load_table_1(page: int, search: str | None):
 
     with get_sql_engine().connect() as conn:
         if search:
+            if trigram_available():
+                match_sql, order_sql = TRIGRAM_MATCH, f"{TRIGRAM_RANK} DESC, id"
+            else:
+                match_sql, order_sql = PLAIN_MATCH, "id"
             result = conn.execute(
-                text("""
+                text(f"""
                     SELECT id, name, email
                     FROM dummydata
-                    WHERE name ILIKE :search
-                       OR email ILIKE :search
-                    ORDER BY id
+                    WHERE {match_sql}
+                    ORDER BY {order_sql}
                     LIMIT :limit OFFSET :offset
                 """),
                 {
-                    "search": f"%{search}%",
+                    **search_params(search),
                     "limit": PAGE_SIZE,
                     "offset": offset,
                 },
@@ -3,10 +3,20 @@ from pathlib import Path
 
 from flask import Flask, flash, redirect, request, url_for
 from flask_wtf.csrf import CSRFError, generate_csrf
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from app_db import build_database_uri, db, ensure_user_role_column
-from app_db.app_settings import ensure_app_settings_table
+from app_db import build_database_uri, db
+from app_db.migrations import run_migrations
+from app_db.notify import ensure_listener
+from app_db.passwords import configure_password_hasher
+from app_db.principals import configure_principal_cache
+from app_db.tag_catalog import configure_tag_catalog
+from app_db.unit_of_work import configure_read_snapshot
 from flask_app.extensions import csrf, login_manager
+from flask_app.metrics import init_metrics
+from flask_app.profiling import init_profiling
+from flask_app.rate_limit import auth_rate_limiter
+from flask_app.sql_instrumentation import init_sql_instrumentation
 from flask_app.routes.admin import bp as admin_bp
 from flask_app.routes.auth import bp as auth_bp
 from flask_app.routes.example_crud import bp as example_crud_bp
@@ -14,6 +24,7 @@ from flask_app.routes.home import bp as home_bp
 from flask_app.routes.dummydata_crud import bp as dummydata_crud_bp
 from flask_app.routes.docs import bp as docs_bp
 from flask_app.routes.iframe_app_streamlit import bp as iframe_app_streamlit_bp
+from flask_app.routes.metrics import bp as metrics_bp
 # import your routes here
 # Example: from flask_app.routes.my_feature import bp as my_feature_bp
 
@@ -34,12 +45,63 @@ def create_app():
     app.config["SECRET_KEY"] = secret_key or "dev-only-change-this-secret-key"
     app.config["SQLALCHEMY_DATABASE_URI"] = build_database_uri()
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["AUTH_PRINCIPAL_CACHE_TTL"] = float(
+        os.environ.get("AUTH_PRINCIPAL_CACHE_TTL", "30")
+    )
+    configure_principal_cache(ttl_seconds=app.config["AUTH_PRINCIPAL_CACHE_TTL"])
+    # Docs tag catalog: invalidated on doc save/delete; the TTL only covers
+    # writes made outside the app.
+    app.config["DOCS_TAG_CATALOG_TTL"] = float(os.environ.get("DOCS_TAG_CATALOG_TTL", "300"))
+    configure_tag_catalog(ttl_seconds=app.config["DOCS_TAG_CATALOG_TTL"])
+    # Password hashing runs on a bounded pool; stored hashes made with other
+    # parameters are upgraded on the next successful login.
+    configure_password_hasher(
+        method=os.environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"),
+        max_workers=int(os.environ.get("PASSWORD_HASH_WORKERS", "2")),
+        max_queue=int(os.environ.get("PASSWORD_HASH_QUEUE", "32")),
+        timeout_seconds=float(os.environ.get("PASSWORD_HASH_TIMEOUT", "10")),
+    )
+    # Token buckets for /login and /signup ("N/SECONDS" per IP and per username; "0" disables).
+    auth_rate_limiter.configure(
+        ip_rate=os.environ.get("AUTH_RATE_LIMIT_IP", "20/60"),
+        username_rate=os.environ.get("AUTH_RATE_LIMIT_USERNAME", "5/60"),
+        backend=os.environ.get("AUTH_RATE_LIMIT_BACKEND", "memory"),
+        max_keys=int(os.environ.get("AUTH_RATE_LIMIT_MAX_KEYS", "10000")),
+    )
+    # Behind nginx the client IP arrives in X-Forwarded-For; trust that many proxy hops.
+    trusted_proxies = int(os.environ.get("TRUSTED_PROXY_COUNT", "0" if is_debug else "1"))
+    if trusted_proxies > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+    # >0 lets nginx proxy_cache successful /auth-check answers per session cookie.
+    app.config["AUTH_CHECK_CACHE_SECONDS"] = max(
+        0, int(os.environ.get("AUTH_CHECK_CACHE_SECONDS", "0"))
+    )
+
+    # app_db helpers share the request's session connection; GET/HEAD pages
+    # read from one REPEATABLE READ snapshot.
+    configure_read_snapshot(os.environ.get("DB_READ_SNAPSHOT", "True").lower() == "true")
 
     db.init_app(app)
+    # Prometheus /metrics (localhost, or Authorization: Bearer METRICS_TOKEN).
+    init_metrics(app, token=os.environ.get("METRICS_TOKEN", ""))
+    # Query count / DB time per request (Server-Timing) and slow-query log;
+    # switched on and off at runtime from the admin page.
+    init_sql_instrumentation(app, slow_query_ms=float(os.environ.get("SQL_SLOW_QUERY_MS", "250")))
+    # Admin-only sampling profiler for single requests (?_profile=1), see /admin/profiles.
+    init_profiling(
+        app,
+        directory=os.environ.get("PROFILES_DIR", ""),
+        sample_ms=float(os.environ.get("PROFILE_SAMPLE_MS", "5")),
+        keep=int(os.environ.get("PROFILE_KEEP", "50")),
+    )
     csrf.init_app(app)
     setattr(login_manager, "login_view", "auth.login")
     login_manager.init_app(app)
 
+    # Cross-process cache invalidation (LISTEN/NOTIFY); started lazily so each
+    # forked worker gets its own listener thread.
+    app.before_request(ensure_listener)
+
     @app.context_processor
     def inject_csrf_token():
         return {"csrf_token": generate_csrf}
@@ -71,12 +133,11 @@ def create_app():
     app.register_blueprint(dummydata_crud_bp)
     app.register_blueprint(docs_bp)
     app.register_blueprint(iframe_app_streamlit_bp)
+    app.register_blueprint(metrics_bp)
     # register your blueprints here, dont forget to import them at the top
     # Example: app.register_blueprint(my_feature_bp)
-    
-    with app.app_context():
-        db.create_all()
-        ensure_user_role_column()
-        ensure_app_settings_table()
+
+    # One SELECT when the schema is current; DDL only under an advisory lock.
+    run_migrations()
 
     return app
@@ -0,0 +1,168 @@
+"""Prometheus metrics for the Flask gateway (served at /metrics).
+
+Uses prometheus_client when it is installed; otherwise every hook is a no-op
+and /metrics answers 503. Under gunicorn, gunicorn.conf.py points
+PROMETHEUS_MULTIPROC_DIR at a fresh directory before the app is imported, so
+every worker writes its samples there and a scrape of any one worker returns
+the sum over all live workers.
+
+Per-process numbers that the app already tracks as running totals (DB pool,
+in-process caches) are copied into the metrics at the end of each request,
+so values from idle workers can lag by one request.
+"""
+
+import hmac
+import os
+import threading
+import time
+from typing import Callable, Dict
+
+from flask import Flask, Response, g, request
+
+from app_db.engine import pool_stats
+from app_db.app_settings import settings_cache_stats
+from app_db.principals import principal_cache_stats
+from app_db.tag_catalog import tag_catalog_stats
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:  # optional dependency
+    prometheus_client = None
+
+LOCAL_ADDRESSES = ("127.0.0.1", "::1")
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> callable returning a dict with at least "hits" and "misses".
+CACHE_STATS: Dict[str, Callable[[], Dict[str, int]]] = {
+    "principal": principal_cache_stats,
+    "tag_catalog": tag_catalog_stats,
+    "settings": settings_cache_stats,
+}
+
+_metrics_token = ""
+_sync_lock = threading.Lock()
+_last_totals: Dict[str, float] = {}
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        "gateway_request_duration_seconds",
+        "Request latency by endpoint.",
+        ["endpoint", "method"],
+        buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS_IN_FLIGHT = Gauge(
+        "gateway_requests_in_flight",
+        "Requests currently being handled.",
+        multiprocess_mode="livesum",
+    )
+    AUTH_CHECKS = Counter(
+        "gateway_auth_check_total",
+        "nginx auth_request subrequests by outcome.",
+        ["outcome"],
+    )
+    DB_POOL_CONNECTIONS = Gauge(
+        "gateway_db_pool_connections",
+        "Pooled DB connections by state.",
+        ["state"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_WAIT = Counter("gateway_db_pool_wait_seconds", "Time spent waiting for a pooled connection.")
+    DB_POOL_TIMEOUTS = Counter("gateway_db_pool_timeouts", "Pool checkouts that timed out.")
+    CACHE_LOOKUPS = Counter(
+        "gateway_cache_lookups",
+        "In-process cache lookups by cache and result (hit/miss).",
+        ["cache", "result"],
+    )
+    UPLOAD_BYTES = Counter("gateway_docs_upload_bytes", "Bytes stored by docs_upload_image.")
+
+
+def register_cache_stats(name: str, stats: Callable[[], Dict[str, int]]) -> None:
+    """Export hits/misses of another in-process cache as gateway_cache_lookups."""
+    CACHE_STATS[name] = stats
+
+
+def _inc_delta(key: str, total: float, counter) -> None:
+    delta = total - _last_totals.get(key, 0.0)
+    _last_totals[key] = total
+    if delta > 0:
+        counter.inc(delta)
+
+
+def _sync_process_stats() -> None:
+    stats = pool_stats()
+    caches = {name: provider() for name, provider in CACHE_STATS.items()}
+    with _sync_lock:
+        _sync_locked(stats, caches)
+
+
+def _sync_locked(stats, caches) -> None:
+    DB_POOL_CONNECTIONS.labels("checked_out").set(stats["checked_out"])
+    DB_POOL_CONNECTIONS.labels("checked_in").set(stats["checked_in"])
+    DB_POOL_CONNECTIONS.labels("overflow").set(stats["overflow"])
+    _inc_delta("pool_wait", stats["wait_ms_total"] / 1000, DB_POOL_WAIT)
+    _inc_delta("pool_timeouts", stats["timeouts"], DB_POOL_TIMEOUTS)
+    for name, cache in caches.items():
+        _inc_delta(f"{name}:hit", cache.get("hits", 0), CACHE_LOOKUPS.labels(name, "hit"))
+        _inc_delta(f"{name}:miss", cache.get("misses", 0), CACHE_LOOKUPS.labels(name, "miss"))
+
+
+def _before_request():
+    g.metrics_started = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+
+def _teardown_request(_exc):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    REQUESTS_IN_FLIGHT.dec()
+    REQUEST_LATENCY.labels(request.endpoint or "unmatched", request.method).observe(
+        time.perf_counter() - started
+    )
+    _sync_process_stats()
+
+
+def init_metrics(app: Flask, *, token: str = "") -> None:
+    global _metrics_token
+    _metrics_token = token or ""
+    if prometheus_client is None:
+        return
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
+
+
+def record_auth_check(outcome: str) -> None:
+    if prometheus_client is not None:
+        AUTH_CHECKS.labels(outcome).inc()
+
+
+def record_upload_bytes(size: int) -> None:
+    if prometheus_client is not None and size > 0:
+        UPLOAD_BYTES.inc(size)
+
+
+def scrape_allowed() -> bool:
+    """Local scrapers (no proxy in between) or Authorization: Bearer <METRICS_TOKEN>."""
+    if _metrics_token:
+        supplied = request.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {_metrics_token}".encode("utf-8")):
+            return True
+    return request.remote_addr in LOCAL_ADDRESSES and not request.headers.get("X-Forwarded-For")
+
+
+def render_metrics() -> Response:
+    if prometheus_client is None:
+        return Response("prometheus_client is not installed.\n", status=503, mimetype="text/plain")
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid: int) -> None:
+    """gunicorn child_exit hook: drop a dead worker's live gauges."""
+    if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
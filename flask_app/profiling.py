@@ -0,0 +1,143 @@
+"""On-demand sampling profiler for single requests, admin-only.
+
+An admin adds `?_profile=1` to a URL (or sends `X-Profile-Request: 1`). For
+that request a background thread samples the request thread's Python stack
+every PROFILE_SAMPLE_MS milliseconds; at teardown the samples are written in
+collapsed-stack format (one `frame;frame;frame count` line per distinct
+stack, the input of flamegraph.pl / speedscope) under the profiles directory
+and listed at /admin/profiles.
+
+Requests without the flag pay one header and one query-string lookup.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from flask import Flask, g, request
+from flask_login import current_user
+
+from flask_app.routes.permissions import has_role
+
+QUERY_FLAG = "_profile"
+HEADER_FLAG = "X-Profile-Request"
+PROFILE_SUFFIX = ".collapsed"
+SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+_profiles_dir: Optional[Path] = None
+_sample_seconds = 0.005
+_keep = 50
+_project_root = str(Path(__file__).resolve().parent.parent)
+
+
+class StackSampler:
+    """Samples one thread's stack on a timer until stopped."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+
+def _frame_label(frame) -> str:
+    filename = frame.f_code.co_filename
+    if filename.startswith(_project_root):
+        filename = filename[len(_project_root) + 1 :]
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{frame.f_code.co_name}"
+
+
+def _requested() -> bool:
+    return request.args.get(QUERY_FLAG) == "1" or request.headers.get(HEADER_FLAG) == "1"
+
+
+def _start_profile():
+    if not _requested():
+        return
+    if not current_user.is_authenticated or not has_role(current_user, "admin"):
+        return
+    sampler = StackSampler(threading.get_ident(), _sample_seconds)
+    g.profile = (sampler, time.perf_counter())
+    sampler.start()
+
+
+def _stop_profile(_exc):
+    profile = g.pop("profile", None)
+    if profile is None:
+        return
+    sampler, started = profile
+    samples = sampler.stop()
+    elapsed_ms = int((time.perf_counter() - started) * 1000)
+    endpoint = SAFE_NAME_RE.sub("_", request.endpoint or "unmatched")
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    path = profiles_dir() / f"{stamp}-{endpoint}-{elapsed_ms}ms-{os.getpid()}{PROFILE_SUFFIX}"
+    with open(path, "w", encoding="utf-8") as handle:
+        for stack, count in samples.most_common():
+            handle.write(f"{stack} {count}\n")
+    _prune()
+
+
+def profiles_dir() -> Path:
+    target = _profiles_dir or Path(_project_root) / "profiles"
+    target.mkdir(parents=True, exist_ok=True)
+    return target
+
+
+def _prune() -> None:
+    for stale in list_profiles()[_keep:]:
+        (profiles_dir() / stale["name"]).unlink(missing_ok=True)
+
+
+def list_profiles() -> List[Dict[str, object]]:
+    """Stored profiles, newest first."""
+    items = []
+    for path in profiles_dir().glob(f"*{PROFILE_SUFFIX}"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:  # pruned by another worker meanwhile
+            continue
+        items.append(
+            {
+                "name": path.name,
+                "size": stat.st_size,
+                "modified": stat.st_mtime,
+                "recorded": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime)),
+            }
+        )
+    return sorted(items, key=lambda item: item["modified"], reverse=True)
+
+
+def init_profiling(app: Flask, *, directory: str = "", sample_ms: float = 5.0, keep: int = 50) -> None:
+    global _profiles_dir, _sample_seconds, _keep
+    _profiles_dir = Path(directory) if directory else None
+    _sample_seconds = max(0.001, float(sample_ms) / 1000)
+    _keep = max(1, int(keep))
+    app.before_request(_start_profile)
+    app.teardown_request(_stop_profile)
@@ -0,0 +1,172 @@
+"""Token-bucket throttling for credential endpoints (/login, /signup).
+
+Each key (client IP or username, per action) owns a bucket of `capacity`
+tokens refilled at `capacity / period` tokens per second; an attempt costs
+one token. The default backend keeps buckets in a bounded LRU inside the
+process. The PostgreSQL backend shares buckets between gateway processes
+through one UPSERT per check on an UNLOGGED table.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app_db.engine import get_sql_engine
+from app_db.ensure_registry import ensure, register_ensure
+
+DEFAULT_MAX_KEYS = 10000
+SHARED_PRUNE_EVERY = 1000
+SHARED_PRUNE_AGE_SECONDS = 3600
+
+
+def parse_rate(raw: str) -> Optional[Tuple[int, float]]:
+    """Parse 'N/SECONDS' (e.g. '10/60') into (capacity, period). '0' or '' disables."""
+    value = (raw or "").strip()
+    if not value or value == "0":
+        return None
+    count_raw, _, period_raw = value.partition("/")
+    capacity = int(count_raw)
+    period = float(period_raw or "60")
+    if capacity <= 0 or period <= 0:
+        return None
+    return capacity, period
+
+
+class MemoryBucketStore:
+    """Buckets as (tokens, updated_at) tuples in an LRU-bounded OrderedDict."""
+
+    def __init__(self, max_keys: int = DEFAULT_MAX_KEYS):
+        self.max_keys = max(1, int(max_keys))
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (float(capacity), now))
+            available = min(float(capacity), max(tokens, 0.0) + (now - updated_at) * rate)
+            remaining = available - 1.0
+            self._buckets[key] = (remaining, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return remaining >= 0.0
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._buckets)
+
+
+@register_ensure("auth_rate_limits")
+def _create_auth_rate_limits(conn):
+    conn.execute(
+        text(
+            """
+            CREATE UNLOGGED TABLE IF NOT EXISTS auth_rate_limits (
+                bucket_key VARCHAR(300) PRIMARY KEY,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at DOUBLE PRECISION NOT NULL
+            )
+            """
+        )
+    )
+
+
+class PostgresBucketStore:
+    """Buckets shared by all processes in an UNLOGGED table (lost on crash, which is fine)."""
+
+    def __init__(self):
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._calls += 1
+            prune = self._calls % SHARED_PRUNE_EVERY == 0
+        ensure("auth_rate_limits")
+        with get_sql_engine().begin() as conn:
+            remaining = conn.execute(
+                text(
+                    """
+                    INSERT INTO auth_rate_limits AS b (bucket_key, tokens, updated_at)
+                    VALUES (:key, :capacity - 1, :now)
+                    ON CONFLICT (bucket_key) DO UPDATE
+                    SET tokens = LEAST(:capacity, GREATEST(b.tokens, 0) + (:now - b.updated_at) * :rate) - 1,
+                        updated_at = :now
+                    RETURNING tokens
+                    """
+                ),
+                {"key": key, "capacity": float(capacity), "now": now, "rate": rate},
+            ).scalar_one()
+            if prune:
+                conn.execute(
+                    text("DELETE FROM auth_rate_limits WHERE updated_at < :cutoff"),
+                    {"cutoff": now - SHARED_PRUNE_AGE_SECONDS},
+                )
+        return remaining >= 0.0
+
+    def size(self) -> int:
+        return -1
+
+
+class AuthRateLimiter:
+    """Per-IP and per-username limits for each credential action."""
+
+    def __init__(self):
+        self.ip_rate: Optional[Tuple[int, float]] = None
+        self.username_rate: Optional[Tuple[int, float]] = None
+        self.store = MemoryBucketStore()
+        self._stats_lock = threading.Lock()
+        self._stats = {"admitted": 0, "rejected_ip": 0, "rejected_username": 0, "backend_errors": 0}
+
+    def configure(self, *, ip_rate: str, username_rate: str, backend: str = "memory", max_keys: int = DEFAULT_MAX_KEYS):
+        self.ip_rate = parse_rate(ip_rate)
+        self.username_rate = parse_rate(username_rate)
+        if (backend or "memory").strip().lower() == "postgres":
+            self.store = PostgresBucketStore()
+        else:
+            self.store = MemoryBucketStore(max_keys=max_keys)
+
+    def _take(self, key: str, rate: Tuple[int, float]) -> bool:
+        capacity, period = rate
+        try:
+            return self.store.take(key, capacity, capacity / period)
+        except SQLAlchemyError:
+            # Shared backend unavailable: fail open rather than locking everyone out.
+            self._count("backend_errors")
+            return True
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def check(self, action: str, ip: Optional[str], username: str) -> Optional[str]:
+        """Consume one attempt. Returns None if admitted, else the scope that rejected it."""
+        if self.ip_rate and ip and not self._take(f"{action}:ip:{ip}", self.ip_rate):
+            self._count("rejected_ip")
+            return "ip"
+        if self.username_rate and username and not self._take(
+            f"{action}:user:{username.lower()}", self.username_rate
+        ):
+            self._count("rejected_username")
+            return "username"
+        self._count("admitted")
+        return None
+
+    def retry_after_seconds(self, scope: str) -> int:
+        rate = self.ip_rate if scope == "ip" else self.username_rate
+        if not rate:
+            return 1
+        capacity, period = rate
+        return max(1, int(round(period / capacity)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {**self._stats, "tracked_keys": self.store.size()}
+
+
+auth_rate_limiter = AuthRateLimiter()
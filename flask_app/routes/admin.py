@@ -1,8 +1,22 @@
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import Blueprint, abort, flash, redirect, render_template, request, send_from_directory, url_for
 from flask_login import current_user, login_required
 
-from app_db import ROLE_CHOICES, User, db, normalize_role
-from app_db.app_settings import get_allow_signup, set_allow_signup
+from app_db import ROLE_CHOICES, PasswordHasherBusy, User, db, normalize_role
+from app_db.app_settings import (
+    KEY_SQL_INSTRUMENTATION,
+    get_allow_signup,
+    get_setting,
+    set_allow_signup,
+    set_setting,
+    settings_cache_stats,
+)
+from app_db.engine import pool_stats
+from app_db.ensure_registry import ensure_status
+from app_db.passwords import password_hasher_stats
+from app_db.principals import invalidate_principal, principal_cache_stats
+from app_db.tag_catalog import tag_catalog_stats
+from flask_app.profiling import PROFILE_SUFFIX, list_profiles, profiles_dir
+from flask_app.rate_limit import auth_rate_limiter
 from flask_app.routes.permissions import role_required
 
 bp = Blueprint("admin", __name__)
@@ -22,6 +36,14 @@ def admin():
         users=users,
         roles=ROLE_CHOICES,
         allow_signup_setting=get_allow_signup(),
+        sql_instrumentation_setting=get_setting(KEY_SQL_INSTRUMENTATION),
+        auth_cache_stats=principal_cache_stats(),
+        tag_catalog_stats=tag_catalog_stats(),
+        settings_cache_stats=settings_cache_stats(),
+        password_hash_stats=password_hasher_stats(),
+        rate_limit_stats=auth_rate_limiter.stats(),
+        ensured_tables=[item["name"] for item in ensure_status() if item["ran"]],
+        db_pool_stats=pool_stats(),
     )
 
 
@@ -32,6 +54,8 @@ def admin_settings():
     allow_signup_raw = (request.form.get("allow_signup") or "").strip().lower()
     allowed = allow_signup_raw in ("1", "true", "yes", "on")
     set_allow_signup(allowed)
+    sql_timing_raw = (request.form.get("sql_instrumentation") or "").strip().lower()
+    set_setting(KEY_SQL_INSTRUMENTATION, sql_timing_raw in ("1", "true", "yes", "on"))
     flash("Site settings updated.")
     return redirect(url_for("admin.admin"))
 
@@ -79,6 +103,10 @@ def admin_add_user():
     except ValueError:
         flash("Invalid password.")
         return redirect(url_for("admin.admin", **add_modal_param))
+    except PasswordHasherBusy:
+        db.session.rollback()
+        flash("The server is busy. Please try again in a moment.")
+        return redirect(url_for("admin.admin", **add_modal_param))
 
     return redirect(url_for("admin.admin"))
 
@@ -128,8 +156,13 @@ def admin_edit_user(user_id):
         except ValueError:
             flash("Invalid password.")
             return redirect(url_for("admin.admin"))
+        except PasswordHasherBusy:
+            db.session.rollback()
+            flash("The server is busy. Please try again in a moment.")
+            return redirect(url_for("admin.admin"))
 
     db.session.commit()
+    invalidate_principal(user.id)
     flash(f"User {user.username} updated with role '{role}'")
     return redirect(url_for("admin.admin"))
 
@@ -145,5 +178,22 @@ def admin_delete_user(user_id):
     user = User.query.get_or_404(user_id)
     db.session.delete(user)
     db.session.commit()
+    invalidate_principal(user_id)
     flash(f"User {user.username} deleted")
     return redirect(url_for("admin.admin"))
+
+
+@bp.route("/admin/profiles")
+@login_required
+@role_required("admin", message="Access denied: Admins only.")
+def admin_profiles():
+    return render_template("admin_profiles.html", profiles=list_profiles())
+
+
+@bp.route("/admin/profiles/<path:filename>")
+@login_required
+@role_required("admin", message="Access denied: Admins only.")
+def admin_profile_download(filename):
+    if "/" in filename or not filename.endswith(PROFILE_SUFFIX):
+        abort(404)
+    return send_from_directory(profiles_dir(), filename, mimetype="text/plain", as_attachment=True)
@@ -1,21 +1,66 @@
 from typing import Optional
 
-from flask import Blueprint, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    session,
+    url_for,
+)
 from flask_login import current_user, login_required, login_user, logout_user
 
-from app_db import User, db
+from app_db import PasswordHasherBusy, User, db
+from app_db.passwords import record_rehash
+from app_db.principals import Principal, get_principal, invalidate_principal
 from flask_app.extensions import login_manager
+from flask_app.metrics import record_auth_check
+from flask_app.rate_limit import auth_rate_limiter
 
 bp = Blueprint("auth", __name__)
 
+BUSY_MESSAGE = "The server is busy. Please try again in a moment."
+
 
 @login_manager.user_loader
-def load_user(user_id: str) -> Optional[User]:
+def load_user(user_id: str) -> Optional[Principal]:
+    # current_user is a cached Principal (id, username, role), not the ORM row.
     try:
         user_pk = int(user_id)
     except (TypeError, ValueError):
         return None
-    return db.session.get(User, user_pk)
+    return get_principal(user_pk)
+
+
+def _throttled(action: str, username: str, template: str):
+    """Return a 429 response when this IP or username is over its attempt budget.
+
+    Runs before any user lookup or password hashing.
+    """
+    scope = auth_rate_limiter.check(action, request.remote_addr, username)
+    if scope is None:
+        return None
+    flash("Too many attempts. Please wait a moment and try again.")
+    response = current_app.make_response((render_template(template), 429))
+    response.headers["Retry-After"] = str(auth_rate_limiter.retry_after_seconds(scope))
+    return response
+
+
+def _upgrade_password_hash(user: User, password: str) -> None:
+    """Rehash with the configured parameters while the plain password is known.
+
+    Best effort: a saturated hashing pool just postpones the upgrade.
+    """
+    if not user.password_needs_rehash():
+        return
+    try:
+        user.set_password(password)
+        db.session.commit()
+        record_rehash()
+    except PasswordHasherBusy:
+        db.session.rollback()
 
 
 @bp.route("/login", methods=["GET", "POST"])
@@ -26,15 +71,23 @@ def login():
     if request.method == "POST":
         username = (request.form.get("username") or "").strip()
         password = request.form.get("password") or ""
+        throttled = _throttled("login", username, "login.html")
+        if throttled is not None:
+            return throttled
         if not username:
             flash("Invalid username or password")
         else:
             user = User.query.filter_by(username=username).first()
 
-            if user and user.check_password(password):
-                login_user(user)
-                return redirect(url_for("home.index"))
-            flash("Invalid username or password")
+            try:
+                if user and user.check_password(password):
+                    _upgrade_password_hash(user, password)
+                    login_user(user)
+                    return redirect(url_for("home.index"))
+                flash("Invalid username or password")
+            except PasswordHasherBusy:
+                flash(BUSY_MESSAGE)
+                return render_template("login.html"), 503
 
     return render_template("login.html")
 
@@ -54,6 +107,9 @@ def signup():
         username = (request.form.get("username") or "").strip()
         email = (request.form.get("email") or "").strip().lower()
         password = request.form.get("password") or ""
+        throttled = _throttled("signup", username, "signup.html")
+        if throttled is not None:
+            return throttled
 
         if not username:
             flash("Username is required.")
@@ -79,6 +135,10 @@ def signup():
                     return redirect(url_for("auth.login"))
                 except ValueError:
                     flash("Invalid password.")
+                except PasswordHasherBusy:
+                    db.session.rollback()
+                    flash(BUSY_MESSAGE)
+                    return render_template("signup.html"), 503
 
     return render_template("signup.html")
 
@@ -105,7 +165,13 @@ def change_password():
             flash("Current password is required.")
             return render_template("change_password.html")
 
-        if not current_user.check_password(current):
+        user = db.session.get(User, current_user.id)
+        try:
+            password_ok = user is not None and user.check_password(current)
+        except PasswordHasherBusy:
+            flash(BUSY_MESSAGE)
+            return render_template("change_password.html"), 503
+        if not password_ok:
             flash("Current password is incorrect.")
             return render_template("change_password.html")
 
@@ -118,18 +184,51 @@ def change_password():
             return render_template("change_password.html")
 
         try:
-            current_user.set_password(new_password)
+            user.set_password(new_password)
             db.session.commit()
+            invalidate_principal(user.id)
             flash("Your password has been updated.")
             return redirect(url_for("home.index"))
         except ValueError:
             flash("Invalid new password.")
+        except PasswordHasherBusy:
+            flash(BUSY_MESSAGE)
+            return render_template("change_password.html"), 503
 
     return render_template("change_password.html")
 
 
+def _is_session_cookie_login() -> bool:
+    """True when the request carries a session cookie with a logged-in user (nginx keys its cache on that cookie)."""
+    cookie_value = request.cookies.get(current_app.config.get("SESSION_COOKIE_NAME", "session"))
+    return bool(cookie_value) and session.get("_user_id") is not None
+
+
+def _auth_check_response(body, status):
+    """Attach nginx proxy_cache metadata when AUTH_CHECK_CACHE_SECONDS is enabled.
+
+    Only 200s for a cookie-backed session login are cacheable; 401s and
+    remember-me logins are always re-asked. Logging out rotates the session
+    cookie, so nginx stops matching the old entry immediately; deletions and
+    role changes are bounded by the short max-age.
+    """
+    response = current_app.make_response((body, status))
+    max_age = current_app.config.get("AUTH_CHECK_CACHE_SECONDS", 0)
+    if max_age <= 0 or status != 200 or not _is_session_cookie_login():
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["X-Accel-Expires"] = "0"
+        return response
+    response.headers["Cache-Control"] = f"max-age={max_age}"
+    response.headers["X-Accel-Expires"] = str(max_age)
+    response.headers["Vary"] = "Cookie"
+    return response
+
+
 @bp.route("/auth-check")
 def auth_check():
+    # load_user resolves through the cached principal, so this is no ORM user load on a hit.
     if current_user.is_authenticated:
-        return "Authenticated", 200
-    return "Unauthorized", 401
+        record_auth_check("authenticated")
+        return _auth_check_response("Authenticated", 200)
+    record_auth_check("unauthorized")
+    return _auth_check_response("Unauthorized", 401)
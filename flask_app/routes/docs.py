@@ -1,6 +1,5 @@
 import os
 import uuid
-import re
 from pathlib import Path
 
 from flask import (
@@ -27,40 +26,30 @@ from app_db import (
     normalize_role,
     User,
 )
+from app_db.docs_search import render_headline
+from app_db.docs_tags import TAG_MATCH_ALL, TAG_MATCH_ANY
+from app_db.tag_catalog import invalidate_tag_catalog
 from app_db.user_roles import EDITOR_MENU_ROLES
 from app_db.docs_attachments import (
     cleanup_orphaned_files,
     get_docs_attachments_dir,
     get_legacy_attachments_dir,
 )
+from flask_app.metrics import record_upload_bytes
 from flask_app.routes.permissions import admin_required, role_required
 
 bp = Blueprint("docs", __name__)
 
 ALLOWED_IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
-TAG_RE = re.compile(r"<[^>]+>")
 DOCS_PER_PAGE_OPTIONS = (12, 24, 48, 96)
 MAX_IMAGE_UPLOAD_BYTES = 10 * 1024 * 1024  # 10 MB
 
 
-def _preview_text(summary, content_html, max_words=40):
-    source = (summary or "").strip()
-    if not source or source.lower() in {"none", "null", "n/a", "-"}:
-        source = TAG_RE.sub(" ", content_html or "")
-    words = [word for word in source.split() if word]
-    if not words:
-        return ""
-    preview = " ".join(words[:max_words])
-    if len(words) > max_words:
-        preview += "..."
-    return preview
-
-
 def _decorate_docs(rows):
     docs = []
     for row in rows:
         item = dict(row)
-        item["preview_text"] = _preview_text(item.get("summary"), item.get("content_html"))
+        item["search_headline"] = render_headline(item.get("search_headline"))
         docs.append(item)
     return docs
 
@@ -102,19 +91,29 @@ def _pagination_context(page_data):
     per_page = page_data["per_page"]
     page = page_data["page"]
     total_pages = max(1, (total + per_page - 1) // per_page)
-    safe_page = min(max(1, page), total_pages)
+    if page_data["keyset"]:
+        # Cursor links only reach neighbouring pages; "1" restarts from the top.
+        pages = [1] if page == 1 else ([1, page] if page == 2 else [1, None, page])
+        prev_args = {"page": page - 1, "before": page_data["prev_cursor"]}
+        next_args = {"page": page + 1, "after": page_data["next_cursor"]}
+    else:
+        pages = _build_pagination(page, total_pages)
+        prev_args = {"page": page - 1}
+        next_args = {"page": page + 1}
     return {
-        "page": safe_page,
+        "page": page,
         "per_page": per_page,
         "total": total,
+        "total_exact": page_data["total_exact"],
         "total_pages": total_pages,
-        "has_prev": safe_page > 1,
-        "has_next": safe_page < total_pages,
-        "pages": _build_pagination(safe_page, total_pages),
+        "has_prev": page_data["has_prev"],
+        "has_next": page_data["has_next"],
+        "pages": pages if page_data["has_prev"] or page_data["has_next"] else [],
+        "prev_args": prev_args,
+        "next_args": next_args,
     }
 
 
-
 def _attachments_dir() -> Path:
     return get_docs_attachments_dir()
 
@@ -124,16 +123,32 @@ def _attachments_dir() -> Path:
 def docs_index():
     search = (request.args.get("q") or "").strip()
     tags = request.args.getlist("tags")
+    tag_match = TAG_MATCH_ALL if request.args.get("match") == TAG_MATCH_ALL else TAG_MATCH_ANY
     page = _parse_positive_int(request.args.get("page"), 1)
     per_page_raw = _parse_positive_int(request.args.get("per_page"), DOCS_PER_PAGE_OPTIONS[0])
     per_page = per_page_raw if per_page_raw in DOCS_PER_PAGE_OPTIONS else DOCS_PER_PAGE_OPTIONS[0]
-    page_data = list_documents(search=search, tags=tags, page=page, per_page=per_page)
+    page_data = list_documents(
+        search=search,
+        tags=tags,
+        page=page,
+        per_page=per_page,
+        after=request.args.get("after") or "",
+        before=request.args.get("before") or "",
+        facets=True,
+        tag_match=tag_match,
+    )
+    # Every known tag gets a chip (plus active filters that no longer exist);
+    # counts cover the current results.
+    tag_counts = {facet["tag"]: facet["count"] for facet in page_data["facets"]}
     return render_template(
         "docs_index.html",
         docs=_decorate_docs(page_data["items"]),
         query=search,
         active_tags=tags,
-        available_tags=get_all_tags(),
+        available_tags=sorted(set(get_all_tags()) | set(tags)),
+        tag_counts=tag_counts,
+        tag_match=tag_match,
+        match_arg=TAG_MATCH_ALL if tag_match == TAG_MATCH_ALL else None,
         can_manage_docs=_can_manage_docs(current_user),
         per_page_options=DOCS_PER_PAGE_OPTIONS,
         pagination=_pagination_context(page_data),
@@ -153,8 +168,9 @@ def docs_by_tag(tag: str):
         kwargs["q"] = request.args.get("q")
     if request.args.get("per_page"):
         kwargs["per_page"] = request.args.get("per_page")
-    if request.args.get("page"):
-        kwargs["page"] = request.args.get("page")
+    for key in ("page", "after", "before", "match"):
+        if request.args.get(key):
+            kwargs[key] = request.args.get(key)
     return redirect(url_for("docs.docs_index", **kwargs))
 
 
@@ -164,7 +180,7 @@ def docs_view(slug: str):
     doc = get_document_by_slug(slug)
     if not doc:
         abort(404)
-    tags = [tag for tag in (doc.tags_csv or "").split(",") if tag]
+    tags = list(doc.tags or [])
     creator = db.session.get(User, doc.created_by)
     return render_template(
         "docs_view.html",
@@ -212,10 +228,9 @@ def docs_editor(doc_id: int):
             content_html=content_html,
             created_by=current_user.id,
         )
-        # New docs: create_or_update_document returns an unsaved instance; add to session.
-        if doc_id <= 0:
-            db.session.add(saved)
+        # create_or_update_document has flushed the doc (slug allocated); commit it.
         db.session.commit()
+        invalidate_tag_catalog()
         flash("Document saved.")
         return redirect(url_for("docs.docs_view", slug=saved.slug))
 
@@ -258,6 +273,7 @@ def docs_upload_image():
     filename = f"{uuid.uuid4().hex}{ext}"
     destination = _attachments_dir() / filename
     image.save(destination)
+    record_upload_bytes(destination.stat().st_size)
 
     image_url = url_for("docs.docs_attachment", filename=filename)
     return jsonify({"url": image_url})
@@ -340,5 +356,6 @@ def docs_admin_delete_document(doc_id: int):
 
     db.session.delete(doc)
     db.session.commit()
+    invalidate_tag_catalog()
     flash(f"Document '{doc.title}' deleted.")
     return redirect(url_for("docs.docs_index"))
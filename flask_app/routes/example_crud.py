@@ -3,7 +3,8 @@ from flask_login import login_required
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-from app_db import ensure_example_crud_table, get_sql_engine
+from app_db import ensure_example_crud_table
+from app_db.unit_of_work import read_connection, write_transaction
 
 bp = Blueprint("example_crud", __name__)
 
@@ -13,7 +14,7 @@ bp = Blueprint("example_crud", __name__)
 def example_crud():
     try:
         ensure_example_crud_table()
-        with get_sql_engine().connect() as conn:
+        with read_connection() as conn:
             result = conn.execute(
                 text(
                     """
@@ -42,7 +43,7 @@ def example_crud_create():
 
     try:
         ensure_example_crud_table()
-        with get_sql_engine().begin() as conn:
+        with write_transaction() as conn:
             conn.execute(
                 text(
                     """
@@ -70,7 +71,7 @@ def example_crud_edit(item_id):
 
     try:
         ensure_example_crud_table()
-        with get_sql_engine().begin() as conn:
+        with write_transaction() as conn:
             updated = conn.execute(
                 text(
                     """
@@ -98,7 +99,7 @@ def example_crud_edit(item_id):
 def example_crud_delete(item_id):
     try:
         ensure_example_crud_table()
-        with get_sql_engine().begin() as conn:
+        with write_transaction() as conn:
             deleted = conn.execute(
                 text("DELETE FROM example_crud_items WHERE id = :item_id"),
                 {"item_id": item_id},
@@ -1,10 +1,16 @@
 import os
+import secrets
 
-from flask import Blueprint, current_app, render_template
+from flask import Blueprint, current_app, render_template, request
 from flask_login import login_required
 
 bp = Blueprint("iframe_app_streamlit", __name__)
 
+# Stable per-browser key nginx hashes on to pin a user to one Streamlit replica.
+# Unlike the Flask session cookie it does not change when the session is modified.
+AFFINITY_COOKIE = "st_route"
+AFFINITY_MAX_AGE = 30 * 24 * 3600
+
 
 @bp.route("/iframe-app-streamlit")
 @login_required
@@ -13,4 +19,16 @@ def iframe_app_streamlit():
     streamlit_url = f"http://localhost:{streamlit_port}"
     if not current_app.debug:
         streamlit_url = "/streamlit/"
-    return render_template("iframe_app_streamlit.html", streamlit_url=streamlit_url)
+    response = current_app.make_response(
+        render_template("iframe_app_streamlit.html", streamlit_url=streamlit_url)
+    )
+    if not request.cookies.get(AFFINITY_COOKIE):
+        response.set_cookie(
+            AFFINITY_COOKIE,
+            secrets.token_hex(8),
+            max_age=AFFINITY_MAX_AGE,
+            httponly=True,
+            secure=request.is_secure,
+            samesite="Lax",
+        )
+    return response
@@ -0,0 +1,13 @@
+from flask import Blueprint, abort
+
+from flask_app.metrics import render_metrics, scrape_allowed
+
+bp = Blueprint("metrics", __name__)
+
+
+@bp.route("/metrics")
+def metrics():
+    # Local scrapers only, or a bearer METRICS_TOKEN; never through nginx without one.
+    if not scrape_allowed():
+        abort(404)
+    return render_metrics()
@@ -6,14 +6,16 @@ from flask_login import current_user
 from app_db import normalize_role
 
 
-def role_required(*allowed_roles, message="Access denied."):
+def has_role(user, *allowed_roles) -> bool:
     allowed = {normalize_role(role) for role in allowed_roles if role}
+    return normalize_role(getattr(user, "role", "viewer")) in allowed
+
 
+def role_required(*allowed_roles, message="Access denied."):
     def outer(fn):
         @wraps(fn)
         def inner(*args, **kwargs):
-            role = normalize_role(getattr(current_user, "role", "viewer"))
-            if role in allowed:
+            if has_role(current_user, *allowed_roles):
                 return fn(*args, **kwargs)
             flash(message)
             return redirect(url_for("home.index"))
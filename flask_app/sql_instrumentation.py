@@ -0,0 +1,142 @@
+"""Per-request SQL timing: Server-Timing header and a slow-query log.
+
+Hooks the cursor events of the shared engine (app_db.engine), which the ORM
+session and get_sql_engine() callers both use. While the admin setting
+"sql_instrumentation" is on, every request counts its queries, sums their
+time and template render time, and answers with
+
+    Server-Timing: db;dur=12.3;desc="7 queries", render;dur=4.1, total;dur=20.8
+
+Queries slower than the configured threshold are logged as one JSON line on
+the "sql.slow" logger with the route and whitespace-normalized SQL.
+"""
+
+import json
+import logging
+import re
+import time
+from typing import Optional
+
+from flask import Flask, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+
+from app_db.app_settings import KEY_SQL_INSTRUMENTATION, get_setting
+from app_db.engine import get_sql_engine
+
+logger = logging.getLogger("sql.slow")
+
+MAX_LOGGED_SQL_CHARS = 2000
+WHITESPACE_RE = re.compile(r"\s+")
+IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*%\(\w+\)s\s*,?)+\)", re.IGNORECASE)
+
+_slow_query_seconds = 0.25
+
+
+class RequestTiming:
+    __slots__ = ("started", "queries", "db_seconds", "render_seconds", "render_started")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.render_started: Optional[float] = None
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace and expanded IN lists so equal queries log identically."""
+    normalized = WHITESPACE_RE.sub(" ", statement or "").strip()
+    normalized = IN_LIST_RE.sub("IN (...)", normalized)
+    return normalized[:MAX_LOGGED_SQL_CHARS]
+
+
+def _current_timing() -> Optional[RequestTiming]:
+    if not has_request_context():
+        return None
+    return g.get("sql_timing")
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany):
+    if _current_timing() is not None:
+        conn.info.setdefault("sql_timing_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, _executemany):
+    timing = _current_timing()
+    started_stack = conn.info.get("sql_timing_started")
+    if timing is None or not started_stack:
+        return
+    elapsed = time.perf_counter() - started_stack.pop()
+    timing.queries += 1
+    timing.db_seconds += elapsed
+    if elapsed >= _slow_query_seconds:
+        rule = request.url_rule
+        logger.warning(
+            json.dumps(
+                {
+                    "event": "slow_query",
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "method": request.method,
+                    "route": rule.rule if rule is not None else request.path,
+                    "endpoint": request.endpoint,
+                    "sql": normalize_sql(statement),
+                }
+            )
+        )
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("sql_timing_started"):
+        conn.info["sql_timing_started"].pop()
+
+
+def _on_before_render(_app, **_extra):
+    timing = _current_timing()
+    if timing is not None:
+        timing.render_started = time.perf_counter()
+
+
+def _on_rendered(_app, **_extra):
+    timing = _current_timing()
+    if timing is not None and timing.render_started is not None:
+        timing.render_seconds += time.perf_counter() - timing.render_started
+        timing.render_started = None
+
+
+def _start_request_timing():
+    try:
+        enabled = get_setting(KEY_SQL_INSTRUMENTATION)
+    except SQLAlchemyError:
+        enabled = False
+    if enabled:
+        g.sql_timing = RequestTiming()
+
+
+def _add_server_timing(response):
+    timing = _current_timing()
+    if timing is None:
+        return response
+    total_ms = (time.perf_counter() - timing.started) * 1000
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={timing.db_seconds * 1000:.1f};desc="{timing.queries} queries", '
+        f"render;dur={timing.render_seconds * 1000:.1f}, total;dur={total_ms:.1f}",
+    )
+    return response
+
+
+def init_sql_instrumentation(app: Flask, *, slow_query_ms: float) -> None:
+    """Attach engine and request hooks. Timing only runs while the admin setting is on."""
+    global _slow_query_seconds
+    _slow_query_seconds = max(0.0, float(slow_query_ms)) / 1000
+    engine = get_sql_engine()
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    before_render_template.connect(_on_before_render, app)
+    template_rendered.connect(_on_rendered, app)
+    app.before_request(_start_request_timing)
+    app.after_request(_add_server_timing)
@@ -0,0 +1,59 @@
+# Gunicorn settings for `run.py --prod` (Linux). Every value can be overridden
+# with the environment variables below; see docs/DEPLOYMENT.md.
+import glob
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = "auth_server:app"
+bind = f"127.0.0.1:{int(os.environ.get('FLASK_PORT', '5001'))}"
+
+# Pre-fork workers, each with a few threads (I/O-bound: DB, auth subrequests).
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", str(min(8, multiprocessing.cpu_count() * 2 + 1))))
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+# Build create_app() once in the master; workers fork from it.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True").lower() == "true"
+
+# Recycle workers gracefully after N requests (jitter avoids all restarting at once).
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+# /metrics aggregates all workers through prometheus_client's multiprocess
+# mode. Must be set before the app (and prometheus_client) is imported.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), f"gateway-metrics-{bind.rsplit(':', 1)[-1]}")
+)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def on_starting(server):
+    # Discard samples from a previous run. Runs once in the master; this file is
+    # re-read on HUP while workers are alive, so the cleanup must not live at module level.
+    for stale in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(stale)
+
+
+def post_fork(server, worker):
+    # The master's pooled connections were copied into this worker: forget them
+    # (without closing the parent's sockets) so each worker opens its own.
+    # Flask-SQLAlchemy shares this engine, so one dispose covers both.
+    if not server.cfg.preload_app:
+        return
+    from app_db.engine import dispose_sql_engine
+
+    dispose_sql_engine()
+
+
+def child_exit(server, worker):
+    from flask_app.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
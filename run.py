@@ -1,8 +1,16 @@
+import importlib.util
 import subprocess
 import time
 import sys
 import os
 import signal
+import urllib.request
+
+# Replica supervision: probe every HEALTH_INTERVAL seconds, restart after
+# HEALTH_FAILURES consecutive failed probes (ignored during STARTUP_GRACE).
+HEALTH_INTERVAL = 5
+HEALTH_FAILURES = 3
+STARTUP_GRACE = 30
 
 def get_config_ports():
     """Load ports from environment variables with safe defaults."""
@@ -10,10 +18,24 @@ def get_config_ports():
     streamlit_port = int(os.environ.get("STREAMLIT_PORT", "8501"))
     return {"FLASK": flask_port, "STREAMLIT": streamlit_port}
 
+def get_streamlit_replicas():
+    """Number of Streamlit processes (--streamlit-replicas N or STREAMLIT_REPLICAS)."""
+    replicas = os.environ.get("STREAMLIT_REPLICAS", "1")
+    if "--streamlit-replicas" in sys.argv:
+        idx = sys.argv.index("--streamlit-replicas")
+        if idx + 1 < len(sys.argv):
+            replicas = sys.argv[idx + 1]
+    return max(1, int(replicas))
+
+def get_streamlit_ports():
+    """Consecutive ports starting at STREAMLIT_PORT, one per replica."""
+    first_port = get_config_ports()["STREAMLIT"]
+    return [first_port + i for i in range(get_streamlit_replicas())]
+
 def cleanup_ports():
     """Automatically kill any processes currently using the configured ports."""
     config = get_config_ports()
-    ports = [config["FLASK"], config["STREAMLIT"]]
+    ports = [config["FLASK"], *get_streamlit_ports()]
     for port in ports:
         try:
             # -t returns only the PID
@@ -26,6 +48,74 @@ def cleanup_ports():
         except (subprocess.CalledProcessError, ValueError):
             pass
 
+def build_flask_cmd(is_prod):
+    """Werkzeug dev server in development; pre-forking gunicorn workers in production."""
+    if is_prod and importlib.util.find_spec("gunicorn") is not None:
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"]
+    if is_prod:
+        print("⚠️  gunicorn is not installed; falling back to the single-process dev server.")
+    return [sys.executable, "auth_server.py"]
+
+def build_streamlit_cmd(port, is_prod):
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", "dashboard_app.py",
+        "--server.port", str(port),
+        "--server.address", "127.0.0.1",
+        "--server.headless", "true"
+    ]
+    # In production, Streamlit needs to know it's being served under /streamlit/
+    if is_prod:
+        cmd.extend(["--server.baseUrlPath", "/streamlit/"])
+    return cmd
+
+def streamlit_healthy(port, is_prod):
+    base_path = "/streamlit" if is_prod else ""
+    url = f"http://127.0.0.1:{port}{base_path}/_stcore/health"
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+class StreamlitReplica:
+    """One supervised Streamlit process; restarted when it exits or stops answering health checks."""
+
+    def __init__(self, port, is_prod):
+        self.port = port
+        self.is_prod = is_prod
+        self.proc = None
+        self.started_at = 0.0
+        self.failures = 0
+
+    def start(self):
+        self.proc = subprocess.Popen(build_streamlit_cmd(self.port, self.is_prod))
+        self.started_at = time.monotonic()
+        self.failures = 0
+
+    def check(self):
+        if self.proc.poll() is not None:
+            print(f"💥 Streamlit replica on port {self.port} exited ({self.proc.returncode}); restarting...")
+            self.start()
+            return
+        if time.monotonic() - self.started_at < STARTUP_GRACE:
+            return
+        if streamlit_healthy(self.port, self.is_prod):
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.failures >= HEALTH_FAILURES:
+            print(f"🩺 Streamlit replica on port {self.port} failed {self.failures} health checks; restarting...")
+            self.stop()
+            self.start()
+
+    def stop(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
 def run_app():
     # 0. Clean up any zombie processes first
     cleanup_ports()
@@ -39,21 +129,19 @@ def run_app():
     config = get_config_ports()
     flask_port = config["FLASK"]
     streamlit_port = config["STREAMLIT"]
+    streamlit_ports = get_streamlit_ports()
 
-    # 2. Configure Streamlit Command
-    streamlit_cmd = [
-        sys.executable, "-m", "streamlit", "run", "dashboard_app.py",
-        "--server.port", str(streamlit_port),
-        "--server.address", "127.0.0.1",
-        "--server.headless", "true"
-    ]
-    
-    # In production, Streamlit needs to know it's being served under /streamlit/
+    # 2. Start Streamlit replicas (one process per port)
     if is_prod:
-        streamlit_cmd.extend(["--server.baseUrlPath", "/streamlit/"])
         print("📁 Streamlit configured for /streamlit/ proxy path")
-
-    streamlit_proc = subprocess.Popen(streamlit_cmd)
+    if len(streamlit_ports) > 1:
+        print(f"📊 Starting {len(streamlit_ports)} Streamlit replicas on ports {streamlit_ports[0]}-{streamlit_ports[-1]}")
+        print("   Nginx must balance them with session affinity: python3 scripts/generate_nginx_conf.py")
+        if not is_prod:
+            print("   (development iframe only uses the first replica)")
+    replicas = [StreamlitReplica(port, is_prod) for port in streamlit_ports]
+    for replica in replicas:
+        replica.start()
     
     # 2. Configure Flask Environment
     flask_env = os.environ.copy()
@@ -63,8 +151,16 @@ def run_app():
     # Pass ports to sub-processes via env
     flask_env["FLASK_PORT"] = str(flask_port)
     flask_env["STREAMLIT_PORT"] = str(streamlit_port)
+    flask_env["STREAMLIT_REPLICAS"] = str(len(streamlit_ports))
     
-    flask_proc = subprocess.Popen([sys.executable, "auth_server.py"], env=flask_env)
+    flask_cmd = build_flask_cmd(is_prod)
+    if "gunicorn" in flask_cmd:
+        print(
+            f"🧵 Gunicorn: {flask_env.get('GUNICORN_WORKERS', 'auto')} workers x "
+            f"{flask_env.get('GUNICORN_THREADS', '4')} threads (preload, recycle after "
+            f"{flask_env.get('GUNICORN_MAX_REQUESTS', '2000')} requests)"
+        )
+    flask_proc = subprocess.Popen(flask_cmd, env=flask_env)
     
     print("\n✅ Systems are running!")
     if is_prod:
@@ -76,11 +172,17 @@ def run_app():
     print("Press Ctrl+C to stop both servers.")
     
     try:
+        last_health_check = time.monotonic()
         while True:
             time.sleep(1)
+            if time.monotonic() - last_health_check >= HEALTH_INTERVAL:
+                last_health_check = time.monotonic()
+                for replica in replicas:
+                    replica.check()
     except KeyboardInterrupt:
         print("\n🛑 Stopping servers...")
-        streamlit_proc.terminate()
+        for replica in replicas:
+            replica.stop()
         flask_proc.terminate()
         print("Done.")
 
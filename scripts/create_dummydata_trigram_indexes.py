@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Add parent directory to path so we can import from root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_db.trigram import install_dummydata_trigram_indexes
+
+
+def main():
+    # CREATE INDEX CONCURRENTLY: the table stays writable while the indexes build.
+    if not install_dummydata_trigram_indexes():
+        print(
+            "Skipped: the dummydata table does not exist or pg_trgm is not available "
+            "(run CREATE EXTENSION pg_trgm as a superuser first)."
+        )
+        return 1
+    print("dummydata trigram indexes are in place.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+import argparse
+import os
+import sys
+
+
+def get_config_ports():
+    """Load ports from environment variables with safe defaults."""
+    flask_port = int(os.environ.get("FLASK_PORT", "5001"))
+    streamlit_port = int(os.environ.get("STREAMLIT_PORT", "8501"))
+    return {"FLASK": flask_port, "STREAMLIT": streamlit_port}
+
+
+def render_streamlit_upstream(streamlit_port: int, replicas: int) -> str:
+    # Each browser sticks to one replica (Streamlit session state lives in that
+    # process). Key: the st_route cookie Flask sets on the dashboard page,
+    # falling back to the client IP. Passive health checks take a dead replica
+    # out of rotation; run.py restarts it.
+    servers = "\n".join(
+        f"    server 127.0.0.1:{streamlit_port + i} max_fails=2 fail_timeout=10s;" for i in range(replicas)
+    )
+    return f"""map $cookie_st_route $streamlit_affinity {{
+    ""      $remote_addr;
+    default $cookie_st_route;
+}}
+
+upstream streamlit_backend {{
+    hash $streamlit_affinity consistent;
+{servers}
+}}
+
+"""
+
+
+def render_auth_cache_http_block(cache_dir: str) -> str:
+    return f"""# /auth-check decision cache (http context; requires AUTH_CHECK_CACHE_SECONDS > 0 in Flask)
+proxy_cache_path {cache_dir} levels=1:2 keys_zone=authcheck:10m max_size=64m inactive=60s use_temp_path=off;
+
+map $cookie_session $auth_cache_skip {{
+    ""      1;
+    default 0;
+}}
+
+"""
+
+
+def render_auth_check_location(flask_port: int, auth_cache: bool) -> str:
+    cache_lines = ""
+    if auth_cache:
+        cache_lines = """
+        # Flask sets max-age via X-Accel-Expires and only for session-cookie logins.
+        proxy_cache authcheck;
+        proxy_cache_key $cookie_session;
+        proxy_cache_methods GET HEAD;
+        proxy_cache_lock on;
+        proxy_cache_bypass $auth_cache_skip;
+        proxy_no_cache $auth_cache_skip;"""
+    return f"""    location = /auth-check {{
+        internal;
+        proxy_pass http://127.0.0.1:{flask_port}/auth-check;
+        proxy_pass_request_body off;
+        proxy_set_header Content-Length "";{cache_lines}
+    }}
+"""
+
+
+def render_site(
+    *,
+    server_name: str,
+    flask_port: int,
+    streamlit_port: int,
+    streamlit_replicas: int,
+    cert_dir: str,
+    auth_cache: bool,
+    auth_cache_dir: str,
+) -> str:
+    http_block = render_auth_cache_http_block(auth_cache_dir) if auth_cache else ""
+    http_block += render_streamlit_upstream(streamlit_port, streamlit_replicas)
+    return f"""{http_block}# Redirect HTTP to HTTPS
+server {{
+    listen 80;
+    server_name {server_name};
+    return 301 https://$server_name$request_uri;
+}}
+
+# HTTPS
+server {{
+    listen 443 ssl;
+    server_name {server_name};
+
+    ssl_certificate     {cert_dir}/fullchain.pem;
+    ssl_certificate_key {cert_dir}/privkey.pem;
+    ssl_protocols       TLSv1.2 TLSv1.3;
+    ssl_ciphers         ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256:ECDHE-ECDSA-AES256-GCM-SHA384:ECDHE-RSA-AES256-GCM-SHA384;
+
+    location / {{
+        proxy_pass http://127.0.0.1:{flask_port};
+        proxy_set_header Host $host;
+        proxy_set_header X-Real-IP $remote_addr;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $scheme;
+    }}
+
+{render_auth_check_location(flask_port, auth_cache)}
+    location /streamlit/ {{
+        auth_request /auth-check;
+        proxy_pass http://streamlit_backend/streamlit/;
+        proxy_http_version 1.1;
+        proxy_set_header Upgrade $http_upgrade;
+        proxy_set_header Connection "upgrade";
+        proxy_set_header Host $host;
+        proxy_read_timeout 86400s;
+        proxy_next_upstream error timeout http_502 http_503;
+    }}
+}}
+"""
+
+
+def main():
+    ports = get_config_ports()
+    parser = argparse.ArgumentParser(
+        description="Generate the Nginx site config for Flask + Streamlit behind auth_request."
+    )
+    parser.add_argument("--server-name", default="your-domain.example.com", help="Public domain name.")
+    parser.add_argument(
+        "--cert-dir",
+        default=None,
+        help="Directory with fullchain.pem/privkey.pem (default: /etc/letsencrypt/live/<server-name>).",
+    )
+    parser.add_argument("--flask-port", type=int, default=ports["FLASK"], help="Flask port (default: FLASK_PORT).")
+    parser.add_argument(
+        "--streamlit-port",
+        type=int,
+        default=ports["STREAMLIT"],
+        help="First Streamlit port (default: STREAMLIT_PORT).",
+    )
+    parser.add_argument(
+        "--streamlit-replicas",
+        type=int,
+        default=int(os.environ.get("STREAMLIT_REPLICAS", "1")),
+        help="Streamlit replicas on consecutive ports (default: STREAMLIT_REPLICAS or 1).",
+    )
+    parser.add_argument(
+        "--auth-cache",
+        action="store_true",
+        default=int(os.environ.get("AUTH_CHECK_CACHE_SECONDS", "0")) > 0,
+        help="Emit proxy_cache config for /auth-check (default: on when AUTH_CHECK_CACHE_SECONDS > 0).",
+    )
+    parser.add_argument(
+        "--auth-cache-dir",
+        default="/var/cache/nginx/authcheck",
+        help="proxy_cache_path directory for cached auth decisions.",
+    )
+    parser.add_argument("--output", "-o", default="-", help="Output file (default: stdout).")
+    args = parser.parse_args()
+
+    config = render_site(
+        server_name=args.server_name,
+        flask_port=args.flask_port,
+        streamlit_port=args.streamlit_port,
+        streamlit_replicas=max(1, args.streamlit_replicas),
+        cert_dir=args.cert_dir or f"/etc/letsencrypt/live/{args.server_name}",
+        auth_cache=args.auth_cache,
+        auth_cache_dir=args.auth_cache_dir,
+    )
+
+    if args.output == "-":
+        sys.stdout.write(config)
+    else:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(config)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,12 @@ def get_config_ports():
     streamlit_port = int(os.environ.get("STREAMLIT_PORT", "8501"))
     return {"FLASK": flask_port, "STREAMLIT": streamlit_port}
 
+def get_streamlit_ports():
+    """One port per Streamlit replica, starting at STREAMLIT_PORT."""
+    first_port = get_config_ports()["STREAMLIT"]
+    replicas = max(1, int(os.environ.get("STREAMLIT_REPLICAS", "1")))
+    return [first_port + i for i in range(replicas)]
+
 def kill_processes_on_ports(ports):
     """Finds and kills processes listening on the specified ports."""
     for port in ports:
@@ -29,7 +35,7 @@ def kill_processes_on_ports(ports):
 
 if __name__ == "__main__":
     config = get_config_ports()
-    target_ports = [config["FLASK"], config["STREAMLIT"]]
+    target_ports = [config["FLASK"], *get_streamlit_ports()]
     
     print(f"🔍 Checking for background processes on ports: {target_ports}")
     kill_processes_on_ports(target_ports)
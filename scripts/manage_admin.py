@@ -6,6 +6,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from auth_server import app
 from app_db import User, db
+from app_db.principals import invalidate_principal
 
 def create_admin(username, email, password):
     with app.app_context():
@@ -21,6 +22,8 @@ def create_admin(username, email, password):
             db.session.add(user)
         
         db.session.commit()
+        # Running gateway processes drop their cached role for this user.
+        invalidate_principal(user.id)
         print(f"Successfully set {username} as Admin.")
 
 def list_users():
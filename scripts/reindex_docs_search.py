@@ -0,0 +1,40 @@
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_db.docs_search import reindex_docs_search
+from app_db.engine import get_sql_engine
+from app_db.migrations import run_migrations
+from app_db.trigram import install_docs_trigram_indexes
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rebuild documentation_pages.search_vector for existing rows (after changing the search config)."
+    )
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction (default: 500).")
+    parser.add_argument(
+        "--trigram",
+        action="store_true",
+        help="Also (re)create the pg_trgm title/slug indexes, e.g. after installing the extension.",
+    )
+    args = parser.parse_args()
+
+    # Makes sure the column, trigger and index exist first.
+    run_migrations()
+    if args.trigram:
+        with get_sql_engine().begin() as conn:
+            if not install_docs_trigram_indexes(conn):
+                print("pg_trgm is not available; run CREATE EXTENSION pg_trgm as a superuser first.")
+                return 1
+        print("Trigram indexes are in place.")
+    updated = reindex_docs_search(batch_size=max(1, args.batch_size))
+    print(f"Reindexed {updated} documentation page(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
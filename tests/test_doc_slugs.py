@@ -0,0 +1,94 @@
+"""Slug allocation in app_db.docs against a real PostgreSQL database.
+
+Needs DATABASE_URL pointing at a PostgreSQL database the app can migrate;
+skipped otherwise. Every test runs in one transaction that is rolled back.
+"""
+
+import os
+
+import pytest
+
+if not os.environ.get("DATABASE_URL", "").startswith("postgresql"):
+    pytest.skip("DATABASE_URL does not point at PostgreSQL", allow_module_level=True)
+
+from sqlalchemy import text
+
+from app_db import docs
+from app_db.base import db
+from app_db.models import DocumentationPage, User
+from flask_app import create_app
+
+BASE = "slug-test-release"
+
+
+@pytest.fixture(scope="module")
+def app():
+    return create_app()
+
+
+@pytest.fixture
+def author_id(app):
+    with app.app_context():
+        user = User(username="slug-test-author", email="slug-test@example.invalid", password="x")
+        db.session.add(user)
+        db.session.flush()
+        yield user.id
+        db.session.rollback()
+
+
+def _seed(slug, author_id):
+    db.session.add(DocumentationPage(title=slug, slug=slug, content_html="", created_by=author_id))
+    db.session.flush()
+
+
+def _save(title, author_id):
+    page = docs.create_or_update_document(
+        doc_id=0, title=title, content_html="<p>x</p>", summary="", tags_csv="", created_by=author_id
+    )
+    return page.slug
+
+
+def test_saves_after_counter_999_get_distinct_slugs(author_id):
+    _seed(BASE, author_id)
+    _seed(f"{BASE}-999", author_id)
+    first = _save(BASE, author_id)
+    second = _save(BASE, author_id)
+    assert first != second
+    assert {first, second} == {f"{BASE}-2", f"{BASE}-3"}
+
+
+def test_saves_past_three_digit_counters(author_id):
+    _seed(BASE, author_id)
+    db.session.execute(
+        text(
+            """
+            INSERT INTO documentation_pages (title, slug, content_html, created_by)
+            SELECT 'x', :base || '-' || n, '', :author FROM generate_series(2, 999) AS n
+            """
+        ),
+        {"base": BASE, "author": author_id},
+    )
+    assert _save(BASE, author_id) == f"{BASE}-1000"
+    assert _save(BASE, author_id) == f"{BASE}-1001"
+
+
+def test_title_numbers_are_not_counters(author_id):
+    _seed(BASE, author_id)
+    _seed(f"{BASE}-2024", author_id)
+    assert _save(BASE, author_id) == f"{BASE}-2"
+
+
+def test_conflict_retries_past_the_taken_counter(author_id, monkeypatch):
+    _seed(BASE, author_id)
+    _seed(f"{BASE}-5", author_id)
+    allocate = docs._allocate_slug
+    calls = []
+
+    def stale_allocate(base_slug, doc_id=None, after=None):
+        calls.append(after)
+        # First proposal repeats a slug a concurrent save already took.
+        return f"{BASE}-5" if len(calls) == 1 else allocate(base_slug, doc_id=doc_id, after=after)
+
+    monkeypatch.setattr(docs, "_allocate_slug", stale_allocate)
+    assert _save(BASE, author_id) == f"{BASE}-6"
+    assert calls == [None, 5]